@@ -1,26 +1,87 @@
+import os
 import re
 import json
+import mmap
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # stdlib fallback
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 INPUT = "Jsonl path to be cleaned"
 OUTPUT = "Jsonl path to save cleaned data"
 
 PROMPT = "user@ubuntu:~$ "
+BUFFER_SIZE = 1 << 22  # 4 MiB
+_PROMPT_STRIP = PROMPT.strip()
+
+_SUCCESS_RE = re.compile(r"\n*Command completed successfully\.?\n*")
+_NL_RE = re.compile(r"\n{3,}")
 
 def clean_text(text: str) -> str:
     # Remove noisy success phrase
-    text = re.sub(r"\n*Command completed successfully\.?\n*", "\n", text)
+    text = _SUCCESS_RE.sub("\n", text)
 
     # Collapse 3+ newlines → 2 newlines
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _NL_RE.sub("\n\n", text)
 
     # Ensure it ends with a prompt
-    if not text.rstrip().endswith(PROMPT.strip()):
-        text = text.rstrip() + "\n\n" + PROMPT
+    stripped = text.rstrip()
+    if not stripped.endswith(_PROMPT_STRIP):
+        text = stripped + "\n\n" + PROMPT
 
     return text
 
-with open(INPUT, "r") as fin, open(OUTPUT, "w") as fout:
-    for line in fin:
-        obj = json.loads(line)
-        obj["text"] = clean_text(obj["text"])
-        fout.write(json.dumps(obj) + "\n")
+def split_ranges(path: str, parts: int) -> list:
+    """Split a file into byte ranges that each start at a line boundary."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = [0]
+        for k in range(1, parts):
+            nl = mm.find(b"\n", max(size * k // parts, bounds[-1]))
+            bounds.append(size if nl == -1 else nl + 1)
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+def clean_range(part_id: int, start: int, end: int) -> str:
+    """Clean the lines in [start, end) of INPUT into OUTPUT.part<part_id>."""
+    part_path = f"{OUTPUT}.part{part_id}"
+    with open(INPUT, "rb", buffering=BUFFER_SIZE) as fin, \
+            open(part_path, "wb", buffering=BUFFER_SIZE) as fout:
+        fin.seek(start)
+        pos = start
+        while pos < end:
+            line = fin.readline()
+            if not line:
+                break
+            pos += len(line)
+            obj = _loads(line)
+            obj["text"] = clean_text(obj["text"])
+            fout.write(_dumps(obj))
+            fout.write(b"\n")
+    return part_path
+
+if __name__ == "__main__":
+    workers = os.cpu_count() or 1
+    ranges = split_ranges(INPUT, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(clean_range, part_id, start, end)
+                   for part_id, (start, end) in enumerate(ranges)]
+        part_paths = [future.result() for future in futures]
+
+    with open(OUTPUT, "wb") as fout:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, fout, BUFFER_SIZE)
+            os.remove(part_path)
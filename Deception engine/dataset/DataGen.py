@@ -1,13 +1,30 @@
+import os
+import re
 import json
 import random
+import secrets
+import shutil
+from functools import lru_cache
+from multiprocessing import Pool
+import numpy as np
 from faker import Faker
 import datetime
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # stdlib fallback
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 
 
 faker = Faker()
 output_file = "Path to save generated dataset"
 target_size_bytes = 100 * 1024 * 1024  
+BUFFER_SIZE = 1 << 22  # 4 MiB
 
 # === YOUR FULL COMMAND LISTS (unchanged, perfect) ===
 user_cmds = [
@@ -47,145 +64,201 @@ os_cmds = [
 all_cmds = user_cmds + attacker_cmds + package_cmds + os_cmds
 
 # === FULL CHAINING (your original + improved) ===
-def add_chaining(cmd):
-    chains = [
-        "&& echo '[+] Success'",
-        "|| echo '[!] Failed'",
-        "| grep -i error", "| grep -i root", "| grep -v '^#'",
-        "| awk '{print $1}'", "| awk '{print $2}'", "| awk '{print $NF}'",
-        "| tee /tmp/log.txt", "| tee -a /tmp/output.log",
-        ">> /tmp/output.log", "2>/tmp/error.log",
-        "| sed 's/root/admin/g'", "| sed 's/192.168/10.0/g'",
-        "| cut -d: -f1", "| cut -d' ' -f2-",
-        "| sort | uniq", "| sort -nr", "| sort -k5",
-        "| xargs -I {} echo '[*] {}'",
-        "| base64", "| base64 -d",
-        "| tr -d '\\n'", "| tr 'a-z' 'A-Z'",
-        "| rev", "| head -n 10", "| tail -n 5", "| wc -l",
-        "; echo '---'", "&& sleep 1", "|| sleep 2"
-    ]
-    if random.random() < 0.5:  # 50% chance of chaining
-        chain = random.choice(chains)
-        if random.random() < 0.3:  # 30% chance of double chain
-            chain += " " + random.choice(chains)
-        return f"{cmd} {chain}"
-    return cmd
+CHAINS = (
+    "&& echo '[+] Success'",
+    "|| echo '[!] Failed'",
+    "| grep -i error", "| grep -i root", "| grep -v '^#'",
+    "| awk '{print $1}'", "| awk '{print $2}'", "| awk '{print $NF}'",
+    "| tee /tmp/log.txt", "| tee -a /tmp/output.log",
+    ">> /tmp/output.log", "2>/tmp/error.log",
+    "| sed 's/root/admin/g'", "| sed 's/192.168/10.0/g'",
+    "| cut -d: -f1", "| cut -d' ' -f2-",
+    "| sort | uniq", "| sort -nr", "| sort -k5",
+    "| xargs -I {} echo '[*] {}'",
+    "| base64", "| base64 -d",
+    "| tr -d '\\n'", "| tr 'a-z' 'A-Z'",
+    "| rev", "| head -n 10", "| tail -n 5", "| wc -l",
+    "; echo '---'", "&& sleep 1", "|| sleep 2"
+)
+CHAIN_PROB = 0.5         # 50% chance of chaining
+DOUBLE_CHAIN_PROB = 0.3  # 30% chance of double chain
 
 # === REALISTIC FAKE OUTPUTS (no subprocess, 100% safe) ===
 faker = Faker()
 
-def fake_output(cmd: str) -> str:
-    cmd_lower = cmd.lower().strip()
+# =============================================
+# PACKAGE MANAGERS — SAFE + REALISTIC
+# =============================================
+
+# APT / DPKG
+APT_PACKAGES = (
+    "ii  curl                  8.5.0-2ubuntu10.4          amd64        command line tool",
+    "ii  wget                  1.21.4-1ubuntu4            amd64        retrieves files from the web",
+    "ii  nginx                 1.24.0-2ubuntu7            amd64        high performance web server",
+    "ii  python3               3.12.3-0ubuntu1            amd64        interactive Python",
+    "ii  openssh-server        1:9.6p1-3ubuntu13.3        amd64        secure shell server",
+    "ii  docker.io             24.0.7-0ubuntu2            amd64        Docker runtime",
+    "ii  mysql-server          8.0.37-0ubuntu0.22.04.3    amd64        MySQL database",
+    "ii  git                   1:2.43.0-1ubuntu7          amd64        fast version control",
+    "ii  vim                   2:9.0.1000-4ubuntu3        amd64        Vi IMproved",
+    "ii  htop                  3.3.0-3                    amd64        interactive process viewer",
+    "ii  tree                  2.1.1-2                    amd64        display directory tree",
+    "ii  fail2ban              1.0.2-3                    amd64        ban hosts that cause failures",
+    "ii  ufw                   0.36.2-6                   amd64        Uncomplicated Firewall",
+)
+
+# Output variants are sampled once up front instead of re-sampled and
+# re-joined for every session.
+OUTPUT_VARIANTS = 256
+# ← SAFE: never ask for more than we have
+_APT_CACHE = tuple(
+    "\n".join(random.sample(APT_PACKAGES, random.randint(10, len(APT_PACKAGES)))) + "\n"
+    for _ in range(OUTPUT_VARIANTS)
+)
+
+def _out_apt_installed(cmd, cmd_lower):
+    return random.choice(_APT_CACHE)
+
+def _out_apt_update(cmd, cmd_lower):
+    return ("Hit:1 http://archive.ubuntu.com/ubuntu noble InRelease\n"
+            "Hit:2 http://archive.ubuntu.com/ubuntu noble-updates InRelease\n"
+            "Get:3 http://security.ubuntu.com/ubuntu noble-security InRelease [89.7 kB]\n"
+            "Reading package lists... Done\n"
+            "Building dependency tree... Done\n"
+            "Reading state information... Done\n"
+            "27 packages can be upgraded. Run 'apt list --upgradable' to see them.\n")
+
+def _out_apt_upgrade(cmd, cmd_lower):
+    return ("Reading package lists... Done\n"
+            "Calculating upgrade... Done\n"
+            "The following packages will be upgraded:\n"
+            "  curl nginx openssl python3-minimal libssl3\n"
+            "9 upgraded, 0 newly installed, 0 to remove and 18 not upgraded.\n")
+
+def _out_apt_show(cmd, cmd_lower):
+    return ("Package: nginx\n"
+            "Version: 1.24.0-2ubuntu7\n"
+            "Status: install ok installed\n"
+            "Priority: optional\n"
+            "Section: httpd\n"
+            "Installed-Size: 1,234 kB\n"
+            "Description: high performance web server\n")
+
+# PIP
+PIP_PACKAGES = (
+    "requests==2.32.3",
+    "boto3==1.34.131",
+    "paramiko==3.4.0",
+    "flask==3.0.3",
+    "django==5.0.7",
+    "scapy==2.5.0",
+    "beautifulsoup4==4.12.3",
+    "psutil==5.9.8",
+    "pycryptodome==3.20.0",
+)
+
+_PIP_CACHE = tuple(
+    "Package            Version\n------------------ ---------\n"
+    + "\n".join(random.sample(PIP_PACKAGES, random.randint(8, len(PIP_PACKAGES)))) + "\n"
+    for _ in range(OUTPUT_VARIANTS)
+)
+
+def _out_pip_list(cmd, cmd_lower):
+    return random.choice(_PIP_CACHE)
+
+# BREW
+def _out_brew_list(cmd, cmd_lower):
+    return "curl    wget    htop    nginx    node    python@3.12    docker    mysql-client    git\n"
+
+# CARGO
+def _out_cargo_install(cmd, cmd_lower):
+    pkg = cmd.split()[-1] if len(cmd.split()) > 2 else "ripgrep"
+    return f"    Updating crates.io index\n  Installing {pkg} v14.1.0\n   Compiling {pkg} v14.1.0\n    Finished release [optimized] target(s) in 9.87s\n  Installed package `{pkg} v14.1.0`\n"
+
+# NPM / GEM / SNAP / FLATPAK
+def _out_npm_list(cmd, cmd_lower):
+    return "/usr/local/lib\n├── npm@10.8.2\n├── pm2@5.3.1\n├── yarn@1.22.19\n└── serve@14.2.1\n"
+
+def _out_snap_list(cmd, cmd_lower):
+    return "Name      Version    Rev   Tracking       Publisher   Notes\ncore22    20240503   1380  latest/stable  canonical   core\nhtop      3.3.0      3995  latest/stable  snapcrafters -\n"
+
+# =============================================
+# NETWORK TOOLS — PERFECT
+# =============================================
+
+def _out_netstat(cmd, cmd_lower):
+    return ("Active Internet connections (only servers)\n"
+            "Proto Recv-Q Send-Q Local Address           Foreign Address         State\n"
+            "tcp        0      0 0.0.0.0:22              0.0.0.0:*               LISTEN\n"
+            "tcp        0      0 127.0.0.1:3306          0.0.0.0:*               LISTEN\n"
+            "udp        0      0 0.0.0.0:68              0.0.0.0:*\n")
+
+def _out_lsof(cmd, cmd_lower):
+    return ("COMMAND  PID USER   FD   TYPE DEVICE SIZE/OFF NODE NAME\n"
+            "sshd    1234 root    3u  IPv4  12345      0t0  TCP *:22 (LISTEN)\n"
+            "nginx   9012 www-data 6u  IPv4  45678      0t0  TCP *:80 (LISTEN)\n")
+
+def _out_curl(cmd, cmd_lower):
+    if "example.com" in cmd_lower:
+        return "<!doctype html><html><head><title>Example Domain</title></head><body><h1>Example Domain</h1></body></html>\n"
+    return "curl: (6) Could not resolve host: malicious.site\n"
+
+def _out_nmap(cmd, cmd_lower):
+    return ("Nmap scan report for localhost (127.0.0.1)\n"
+            "Host is up.\n"
+            "PORT   STATE SERVICE\n"
+            "22/tcp open  ssh\n"
+            "80/tcp open  http\n")
+
+# Trigger substrings in priority order — when several match, the earliest
+# entry wins, exactly like the original if-chain did.
+TRIGGERS = [
+    ("apt list --installed", _out_apt_installed),
+    ("dpkg -l", _out_apt_installed),
+    ("apt update", _out_apt_update),
+    ("apt upgrade", _out_apt_upgrade),
+    ("apt show", _out_apt_show),
+    ("apt-cache policy", _out_apt_show),
+    ("pip list", _out_pip_list),
+    ("pip freeze", _out_pip_list),
+    ("brew list", _out_brew_list),
+    ("cargo install", _out_cargo_install),
+    ("npm list -g", _out_npm_list),
+    ("snap list", _out_snap_list),
+    ("netstat", _out_netstat),
+    ("ss ", _out_netstat),
+    ("lsof -i", _out_lsof),
+    ("curl", _out_curl),
+    ("nmap", _out_nmap),
+]
 
-    # =============================================
-    # PACKAGE MANAGERS — SAFE + REALISTIC
-    # =============================================
+# One Aho–Corasick pass finds every trigger in the command; falls back to a
+# single regex alternation scan when pyahocorasick is not installed.
+try:
+    import ahocorasick
 
-    # APT / DPKG
-    if "apt list --installed" in cmd_lower or "dpkg -l" in cmd_lower:
-        packages = [
-            "ii  curl                  8.5.0-2ubuntu10.4          amd64        command line tool",
-            "ii  wget                  1.21.4-1ubuntu4            amd64        retrieves files from the web",
-            "ii  nginx                 1.24.0-2ubuntu7            amd64        high performance web server",
-            "ii  python3               3.12.3-0ubuntu1            amd64        interactive Python",
-            "ii  openssh-server        1:9.6p1-3ubuntu13.3        amd64        secure shell server",
-            "ii  docker.io             24.0.7-0ubuntu2            amd64        Docker runtime",
-            "ii  mysql-server          8.0.37-0ubuntu0.22.04.3    amd64        MySQL database",
-            "ii  git                   1:2.43.0-1ubuntu7          amd64        fast version control",
-            "ii  vim                   2:9.0.1000-4ubuntu3        amd64        Vi IMproved",
-            "ii  htop                  3.3.0-3                    amd64        interactive process viewer",
-            "ii  tree                  2.1.1-2                    amd64        display directory tree",
-            "ii  fail2ban              1.0.2-3                    amd64        ban hosts that cause failures",
-            "ii  ufw                   0.36.2-6                   amd64        Uncomplicated Firewall",
-        ]
-        # ← SAFE: never ask for more than we have
-        k = random.randint(10, len(packages))
-        return "\n".join(random.sample(packages, k)) + "\n"
-
-    if "apt update" in cmd_lower:
-        return ("Hit:1 http://archive.ubuntu.com/ubuntu noble InRelease\n"
-                "Hit:2 http://archive.ubuntu.com/ubuntu noble-updates InRelease\n"
-                "Get:3 http://security.ubuntu.com/ubuntu noble-security InRelease [89.7 kB]\n"
-                "Reading package lists... Done\n"
-                "Building dependency tree... Done\n"
-                "Reading state information... Done\n"
-                "27 packages can be upgraded. Run 'apt list --upgradable' to see them.\n")
-
-    if "apt upgrade" in cmd_lower:
-        return ("Reading package lists... Done\n"
-                "Calculating upgrade... Done\n"
-                "The following packages will be upgraded:\n"
-                "  curl nginx openssl python3-minimal libssl3\n"
-                "9 upgraded, 0 newly installed, 0 to remove and 18 not upgraded.\n")
-
-    if "apt show" in cmd_lower or "apt-cache policy" in cmd_lower:
-        return ("Package: nginx\n"
-                "Version: 1.24.0-2ubuntu7\n"
-                "Status: install ok installed\n"
-                "Priority: optional\n"
-                "Section: httpd\n"
-                "Installed-Size: 1,234 kB\n"
-                "Description: high performance web server\n")
-
-    # PIP
-    if "pip list" in cmd_lower or "pip freeze" in cmd_lower:
-        packages = [
-            "requests==2.32.3",
-            "boto3==1.34.131",
-            "paramiko==3.4.0",
-            "flask==3.0.3",
-            "django==5.0.7",
-            "scapy==2.5.0",
-            "beautifulsoup4==4.12.3",
-            "psutil==5.9.8",
-            "pycryptodome==3.20.0",
-        ]
-        k = random.randint(8, len(packages))
-        return "Package            Version\n------------------ ---------\n" + "\n".join(random.sample(packages, k)) + "\n"
-
-    # BREW
-    if "brew list" in cmd_lower:
-        return "curl    wget    htop    nginx    node    python@3.12    docker    mysql-client    git\n"
-
-    # CARGO
-    if "cargo install" in cmd_lower:
-        pkg = cmd.split()[-1] if len(cmd.split()) > 2 else "ripgrep"
-        return f"    Updating crates.io index\n  Installing {pkg} v14.1.0\n   Compiling {pkg} v14.1.0\n    Finished release [optimized] target(s) in 9.87s\n  Installed package `{pkg} v14.1.0`\n"
-
-    # NPM / GEM / SNAP / FLATPAK
-    if "npm list -g" in cmd_lower:
-        return "/usr/local/lib\n├── npm@10.8.2\n├── pm2@5.3.1\n├── yarn@1.22.19\n└── serve@14.2.1\n"
-
-    if "snap list" in cmd_lower:
-        return "Name      Version    Rev   Tracking       Publisher   Notes\ncore22    20240503   1380  latest/stable  canonical   core\nhtop      3.3.0      3995  latest/stable  snapcrafters -\n"
+    _automaton = ahocorasick.Automaton()
+    for _priority, (_trigger, _handler) in enumerate(TRIGGERS):
+        _automaton.add_word(_trigger, (_priority, _handler))
+    _automaton.make_automaton()
 
-    # =============================================
-    # NETWORK TOOLS — PERFECT
-    # =============================================
+    def _match_trigger(cmd_lower):
+        hits = [value for _, value in _automaton.iter(cmd_lower)]
+        return min(hits, key=lambda hit: hit[0])[1] if hits else None
+except ImportError:
+    _TRIGGER_RE = re.compile("|".join(re.escape(trigger) for trigger, _ in TRIGGERS))
+    _TRIGGER_PRIORITY = {trigger: (priority, handler) for priority, (trigger, handler) in enumerate(TRIGGERS)}
+
+    def _match_trigger(cmd_lower):
+        hits = [_TRIGGER_PRIORITY[m.group(0)] for m in _TRIGGER_RE.finditer(cmd_lower)]
+        return min(hits, key=lambda hit: hit[0])[1] if hits else None
+
+def fake_output(cmd: str) -> str:
+    cmd_lower = cmd.lower().strip()
 
-    if "netstat" in cmd_lower or "ss " in cmd_lower:
-        return ("Active Internet connections (only servers)\n"
-                "Proto Recv-Q Send-Q Local Address           Foreign Address         State\n"
-                "tcp        0      0 0.0.0.0:22              0.0.0.0:*               LISTEN\n"
-                "tcp        0      0 127.0.0.1:3306          0.0.0.0:*               LISTEN\n"
-                "udp        0      0 0.0.0.0:68              0.0.0.0:*\n")
-
-    if "lsof -i" in cmd_lower:
-        return ("COMMAND  PID USER   FD   TYPE DEVICE SIZE/OFF NODE NAME\n"
-                "sshd    1234 root    3u  IPv4  12345      0t0  TCP *:22 (LISTEN)\n"
-                "nginx   9012 www-data 6u  IPv4  45678      0t0  TCP *:80 (LISTEN)\n")
-
-    if "curl" in cmd_lower:
-        if "example.com" in cmd_lower:
-            return "<!doctype html><html><head><title>Example Domain</title></head><body><h1>Example Domain</h1></body></html>\n"
-        return "curl: (6) Could not resolve host: malicious.site\n"
-
-    if "nmap" in cmd_lower:
-        return ("Nmap scan report for localhost (127.0.0.1)\n"
-                "Host is up.\n"
-                "PORT   STATE SERVICE\n"
-                "22/tcp open  ssh\n"
-                "80/tcp open  http\n")
+    handler = _match_trigger(cmd_lower)
+    if handler is not None:
+        return handler(cmd, cmd_lower)
 
     # =============================================
     # FINAL FALLBACK — NEVER [simulated]
@@ -199,24 +272,114 @@ def fake_output(cmd: str) -> str:
     ]) + "\n"
 
 # === MAIN GENERATOR ===
-with open(output_file, "w", encoding="utf-8") as f:
-    total = 0
-    i = 0
-    while total < target_size_bytes:
-        is_root = random.random() < 0.1
-        prompt = "root@ubuntu:# " if is_root else "user@ubuntu:~$ "
-        cmd = add_chaining(random.choice(all_cmds))
-        output = fake_output(cmd)
-        next_prompt = "root@ubuntu:# " if "sudo" in cmd or is_root else "user@ubuntu:~$ "
-
-        full_session = f"{prompt}{cmd}\n{output}\n{next_prompt}"
-
-        line = json.dumps({"text": full_session}, ensure_ascii=False) + "\n"
-        f.write(line)
-        total += len(line.encode("utf-8"))
-        i += 1
-
-        if i % 500 == 0:
-            print(f"Generated {i:,} sessions → {total/1024**2:.1f} MB")
-
-print(f"\nDone: {i:,} perfect sessions → {total/1024**2:.1f} MB")
\ No newline at end of file
+ROOT_PROMPT = "root@ubuntu:# "
+USER_PROMPT = "user@ubuntu:~$ "
+BATCH_SIZE = 10_000
+
+# Records are assembled directly as JSON bytes: every static piece is
+# escaped once up front, outputs are escaped through a cache.
+@lru_cache(maxsize=8192)
+def _json_escape(s: str) -> bytes:
+    """JSON-escape s as UTF-8 bytes, without the surrounding quotes."""
+    return _dumps(s)[1:-1]
+
+_LINE_START = b'{"text":"'
+_LINE_END = b'"}\n'
+_NL = _json_escape("\n")
+_ROOT_PROMPT_B = _json_escape(ROOT_PROMPT)
+_USER_PROMPT_B = _json_escape(USER_PROMPT)
+_CMDS_B = tuple(_json_escape(cmd) for cmd in all_cmds)
+_CHAINS_B = tuple(_json_escape(" " + chain) for chain in CHAINS)
+
+# "sudo" can't straddle the space joining a command and its chains, so the
+# per-piece masks fully decide whether the next prompt is root's
+_SUDO_CMDS = np.array(["sudo" in cmd for cmd in all_cmds], dtype=np.bool_)
+_SUDO_CHAINS = np.array(["sudo" in chain for chain in CHAINS], dtype=np.bool_)
+
+def pick_next_root(cmd_idx, is_root, chain_flip, double_chain_flip, chain_idx):
+    """Vectorized root decision for the prompt that follows each command."""
+    double = chain_flip & double_chain_flip
+    return (
+        is_root
+        | _SUDO_CMDS[cmd_idx]
+        | (chain_flip & _SUDO_CHAINS[chain_idx[:, 0]])
+        | (double & _SUDO_CHAINS[chain_idx[:, 1]])
+    )
+
+def generate_shard(shard_id, bytes_target, seed):
+    """Write ~bytes_target of sessions to its own shard file; returns (path, sessions, bytes)."""
+    # Re-seed both RNGs so forked workers don't replay the parent's stream
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    shard_path = f"{output_file}.{shard_id}"
+
+    with open(shard_path, "wb", buffering=BUFFER_SIZE) as f:
+        json_escape = _json_escape
+        cmds_b = _CMDS_B
+        chains_b = _CHAINS_B
+        total = 0
+        i = 0
+        while total < bytes_target:
+            # Draw every coin flip / index for the batch in one call per array
+            cmd_idx = rng.integers(0, len(all_cmds), size=BATCH_SIZE)
+            is_root = rng.random(BATCH_SIZE) < 0.1
+            chain_flip = rng.random(BATCH_SIZE) < CHAIN_PROB
+            double_chain_flip = rng.random(BATCH_SIZE) < DOUBLE_CHAIN_PROB
+            chain_idx = rng.integers(0, len(CHAINS), size=(BATCH_SIZE, 2))
+            next_root = pick_next_root(cmd_idx, is_root, chain_flip, double_chain_flip, chain_idx)
+
+            cmd_idx = cmd_idx.tolist()
+            is_root = is_root.tolist()
+            chain_flip = chain_flip.tolist()
+            double_chain_flip = double_chain_flip.tolist()
+            chain_idx = chain_idx.tolist()
+            next_root = next_root.tolist()
+
+            for j in range(BATCH_SIZE):
+                k = cmd_idx[j]
+                cmd = all_cmds[k]
+                parts = [_LINE_START, _ROOT_PROMPT_B if is_root[j] else _USER_PROMPT_B, cmds_b[k]]
+                if chain_flip[j]:
+                    first, second = chain_idx[j]
+                    chain = CHAINS[first]
+                    parts.append(chains_b[first])
+                    if double_chain_flip[j]:
+                        chain += " " + CHAINS[second]
+                        parts.append(chains_b[second])
+                    cmd = f"{cmd} {chain}"
+
+                output = fake_output(cmd)
+                next_prompt_b = _ROOT_PROMPT_B if next_root[j] else _USER_PROMPT_B
+
+                # {"text": "<prompt><cmd>\n<output>\n<next_prompt>"}
+                parts += (_NL, json_escape(output), _NL, next_prompt_b, _LINE_END)
+                line_bytes = b"".join(parts)
+                f.write(line_bytes)
+                total += len(line_bytes)
+                i += 1
+
+                if i % 500 == 0:
+                    print(f"[shard {shard_id}] Generated {i:,} sessions → {total/1024**2:.1f} MB")
+
+                if total >= bytes_target:
+                    break
+
+    return shard_path, i, total
+
+if __name__ == "__main__":
+    workers = os.cpu_count() or 1
+    per_shard = -(-target_size_bytes // workers)  # ceil division
+    jobs = [(shard_id, per_shard, secrets.randbits(64)) for shard_id in range(workers)]
+
+    with Pool(workers) as pool:
+        shards = pool.starmap(generate_shard, jobs)
+
+    with open(output_file, "wb") as out:
+        for shard_path, _, _ in shards:
+            with open(shard_path, "rb") as shard:
+                shutil.copyfileobj(shard, out, BUFFER_SIZE)
+            os.remove(shard_path)
+
+    i = sum(count for _, count, _ in shards)
+    total = sum(size for _, _, size in shards)
+    print(f"\nDone: {i:,} perfect sessions → {total/1024**2:.1f} MB")
@@ -1,16 +1,28 @@
 """
 REST API for the persona generator
-Flask-based API with GET endpoints for generating personas and artifacts
+FastAPI-based API with GET endpoints for generating personas and artifacts
+
+Production (see Procfile):
+    gunicorn -k uvicorn.workers.UvicornWorker -w 4 --bind 0.0.0.0:5000 --timeout 300 app:app
+
+Local development:
+    DEV=1 python app.py
 """
 
-import json
+import os
+import queue
+import logging
+import orjson
 import asyncio
-from pathlib import Path
-from typing import Dict, Any, Tuple
-from functools import wraps
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
 
-from flask import Flask, request, jsonify
-from werkzeug.exceptions import BadRequest
+from fastapi import FastAPI, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from src.models import GenerationConfig
 from src.persona import PersonaBuilder
@@ -18,65 +30,108 @@ from src.persistence import SQLiteDB
 from src.gemini_provider import GeminiProvider
 from src.batcher import BatchGenerator
 from src.postprocessor import PostProcessor
+from src.response_cache import ResponseCache
+
+
+logger = logging.getLogger("sag")
+
+
+def _configure_logging() -> QueueListener:
+    """Route the sag logger through a queue drained by a background thread"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return QueueListener(log_queue, handler)
 
 
-app = Flask(__name__)
-app.config['JSON_SORT_KEYS'] = False
+_log_listener = _configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the log listener for the lifetime of the server"""
+    _log_listener.start()
+    try:
+        yield
+    finally:
+        _log_listener.stop()
+
+
+app = FastAPI(
+    title='Persona Generator API',
+    version='1.0',
+    lifespan=lifespan,
+)
 
 
 # ============================================================================
 # UTILITIES
 # ============================================================================
 
-def run_async(func):
-    """Decorator to run async functions in Flask"""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(func(*args, **kwargs))
-        finally:
-            loop.close()
-    return wrapper
-
-
-def parse_query_params() -> Dict[str, Any]:
-    """Parse and validate query parameters"""
-    return {
-        'description': request.args.get('description', '').strip(),
-        'artifacts': request.args.get('artifacts', 5, type=int),
-        'db': request.args.get('db', 'artifacts.db'),
-        'categories': request.args.get('categories', 'code,config,docs'),
-        'model': request.args.get('model', 'gemini-3-flash-preview'),
-        'temperature': request.args.get('temperature', 0.75, type=float),
-        'seed': request.args.get('seed', None, type=int),
-        'output': request.args.get('output', None),
-        'verbose': request.args.get('verbose', 'false').lower() == 'true',
-    }
+def _write_output(path: str, artifact_dicts: List[Dict[str, Any]]) -> None:
+    """Write exported artifacts as indented JSON"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(artifact_dicts, option=orjson.OPT_INDENT_2))
 
 
-def validate_params(params: Dict[str, Any]) -> Tuple[bool, str]:
-    """Validate request parameters"""
-    if not params['description']:
-        return False, "Missing required parameter: description"
-    
-    if params['artifacts'] < 1 or params['artifacts'] > 100:
-        return False, "artifacts must be between 1 and 100"
-    
-    if params['temperature'] < 0.0 or params['temperature'] > 1.0:
-        return False, "temperature must be between 0.0 and 1.0"
-    
-    return True, ""
+# ============================================================================
+# SHARED INSTANCES
+# ============================================================================
+
+_persona_builder = PersonaBuilder()
+
+
+@lru_cache(maxsize=8)
+def _get_provider(model: str) -> GeminiProvider:
+    """Return the shared provider for a model"""
+    return GeminiProvider(model=model)
+
+
+@lru_cache(maxsize=8)
+def _get_db(path: str) -> SQLiteDB:
+    """Return the shared database handle for a path"""
+    return SQLiteDB(path)
+
+
+@lru_cache(maxsize=8)
+def _get_batch_generator(path: str) -> BatchGenerator:
+    """Return the shared batch generator (and its semaphore) for a database"""
+    return BatchGenerator(_get_db(path))
+
+
+@lru_cache(maxsize=8)
+def _get_postprocessor(path: str) -> PostProcessor:
+    """Return the shared post-processor for a database"""
+    return PostProcessor(_get_db(path))
+
+
+@lru_cache(maxsize=8)
+def _get_response_cache(path: str) -> ResponseCache:
+    """Return the shared semantic response cache for a database"""
+    return ResponseCache(_get_db(path))
 
 
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
 
-@app.route('/generate', methods=['GET'])
-@run_async
-async def generate_persona():
+@app.get('/generate')
+async def generate_persona(
+    description: str = '',
+    artifacts: int = Query(5, ge=1, le=100),
+    db: str = 'artifacts.db',
+    categories: str = 'code,config,docs',
+    model: str = 'gemini-3-flash-preview',
+    temperature: float = Query(0.75, ge=0.0, le=1.0),
+    seed: Optional[int] = None,
+    output: Optional[str] = None,
+    verbose: bool = False,
+    no_cache: bool = False,
+):
     """
     Generate a persona and its artifacts
     
@@ -90,75 +145,92 @@ async def generate_persona():
         - seed (optional): Random seed for reproducibility
         - output (optional): Output JSON file path
         - verbose (optional): Enable verbose output (true/false, default: false)
+        - no_cache (optional): Skip the semantic response cache (true/false, default: false)
     
     Example:
         GET /generate?description=Senior%20Python%20engineer&artifacts=5&temperature=0.7
     """
     try:
-        params = parse_query_params()
-        
-        # Validate parameters
-        is_valid, error_msg = validate_params(params)
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
+        description = description.strip()
+        if not description:
+            return JSONResponse({'error': "Missing required parameter: description"}, status_code=400)
         
         # Parse categories
-        categories = [c.strip() for c in params['categories'].split(",")]
+        category_list = [c.strip() for c in categories.split(",")]
         
         # Create configuration
         config = GenerationConfig(
-            num_artifacts=params['artifacts'],
-            temperature=params['temperature'],
-            categories=categories,
-            seed=params['seed'],
-            model=params['model'],
+            num_artifacts=artifacts,
+            temperature=temperature,
+            categories=category_list,
+            seed=seed,
+            model=model,
         )
         
-        if params['verbose']:
-            print(f"[*] Building persona from: {params['description']}")
+        provider = _get_provider(model)
+        
+        # verbose=true surfaces this request's progress at INFO
+        log_level = logging.INFO if verbose else logging.DEBUG
+        
+        # Similar descriptions produce interchangeable artifact sets, so
+        # re-serve a stored response instead of calling Gemini again.
+        # Seeded requests ask for a specific persona and always generate.
+        cache = cache_key = scope = embedding = None
+        if not no_cache and seed is None:
+            cache = _get_response_cache(db)
+            cache_key = ResponseCache.normalize(description)
+            scope = ResponseCache.scope(model, category_list, artifacts)
+            try:
+                embedding = await asyncio.to_thread(provider.embed, cache_key)
+            except Exception as e:
+                logger.warning("Embedding failed, skipping response cache: %s", e)
+            
+            hit = await asyncio.to_thread(cache.lookup, scope, embedding) if embedding else None
+            if hit is not None:
+                logger.log(log_level, "Response cache hit for: %s", description)
+                if output:
+                    await asyncio.to_thread(_write_output, output, hit['artifacts_list'])
+                hit.update(database=db, output_file=output, cached=True)
+                return hit
+        
+        logger.log(log_level, "Building persona from: %s", description)
         
         # Build persona
-        builder = PersonaBuilder()
-        persona = builder.enrich(params['description'], seed=params['seed'])
+        persona = _persona_builder.enrich(description, seed=seed)
         
-        if params['verbose']:
-            print(f"[+] Persona: {persona.name} ({persona.slug})")
-            print(f"[+] Role: {persona.role}")
-            print(f"[+] Company: {persona.company}")
+        logger.log(
+            log_level, "Persona: %s (%s) role=%s company=%s",
+            persona.name, persona.slug, persona.role, persona.company,
+        )
         
-        # Initialize provider and generator
-        provider = GeminiProvider(model=params['model'])
-        db = SQLiteDB(params['db'])
-        batch_gen = BatchGenerator(db)
-        postprocessor = PostProcessor(db)
+        # Initialize generator
+        batch_gen = _get_batch_generator(db)
+        postprocessor = _get_postprocessor(db)
         
-        if params['verbose']:
-            print(f"[*] Generating {params['artifacts']} artifacts...")
+        logger.log(log_level, "Generating %d artifacts", artifacts)
         
         # Generate batch
-        artifacts = await batch_gen.generate_batch(persona, config, provider)
+        generated = await batch_gen.generate_batch(persona, config, provider)
         
-        if params['verbose']:
-            print(f"[+] Generated {len(artifacts)} artifacts")
+        logger.log(log_level, "Generated %d artifacts", len(generated))
         
         # Post-process
-        if params['verbose']:
-            print(f"[*] Validating artifacts...")
+        logger.log(log_level, "Validating artifacts")
+        
+        # Validation and SQLite writes run off the event loop
+        success, failed = await asyncio.to_thread(postprocessor.process_batch, generated)
         
-        success, failed = postprocessor.process_batch(artifacts)
+        logger.log(log_level, "Persisted %d artifacts (%d invalid)", success, failed)
         
-        if params['verbose']:
-            print(f"[+] Persisted {success} artifacts ({failed} invalid)")
+        # Serialize once for both the export and the response
+        artifact_dicts = [a.to_dict() for a in generated]
         
         # Export if requested
-        if params['output']:
-            with open(params['output'], "w") as f:
-                json.dump([a.to_dict() for a in artifacts], f, indent=2)
-            if params['verbose']:
-                print(f"[+] Exported to {params['output']}")
+        if output:
+            await asyncio.to_thread(_write_output, output, artifact_dicts)
+            logger.log(log_level, "Exported to %s", output)
         
-        # Return response
-        return jsonify({
+        response = {
             'success': success > 0,
             'persona': {
                 'name': persona.name,
@@ -167,19 +239,25 @@ async def generate_persona():
                 'company': persona.company,
             },
             'artifacts': {
-                'generated': len(artifacts),
+                'generated': len(generated),
                 'persisted': success,
                 'failed': failed,
             },
-            'database': params['db'],
-            'output_file': params['output'],
-            'artifacts_list': [a.to_dict() for a in artifacts] if artifacts else [],
-        }), 200
+            'database': db,
+            'output_file': output,
+            'artifacts_list': artifact_dicts,
+            'cached': False,
+        }
+        
+        if embedding and success > 0:
+            await asyncio.to_thread(cache.store, cache_key, scope, embedding, response)
+        
+        return response
     
     except ValueError as e:
         error_msg = str(e)
         if "GEMINI_API_KEY" in error_msg:
-            return jsonify({
+            return JSONResponse({
                 'error': error_msg,
                 'setup': {
                     'instruction': 'Set your Gemini API key',
@@ -187,30 +265,30 @@ async def generate_persona():
                     'linux_mac': "export GEMINI_API_KEY='your-key-here'",
                     'get_key': "https://ai.google.dev/"
                 }
-            }), 400
+            }, status_code=400)
         else:
-            return jsonify({'error': error_msg}), 400
+            return JSONResponse({'error': error_msg}, status_code=400)
     
     except Exception as e:
-        return jsonify({
+        return JSONResponse({
             'error': f'Internal server error: {str(e)}',
             'type': type(e).__name__
-        }), 500
+        }, status_code=500)
 
 
-@app.route('/health', methods=['GET'])
-def health_check():
+@app.get('/health')
+async def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return {
         'status': 'healthy',
         'service': 'Persona Generator API',
-    }), 200
+    }
 
 
-@app.route('/info', methods=['GET'])
-def info():
+@app.get('/info')
+async def info():
     """API information and available models"""
-    return jsonify({
+    return {
         'service': 'Persona Generator API',
         'version': '1.0',
         'endpoints': {
@@ -269,6 +347,11 @@ def info():
                 'type': 'boolean',
                 'default': False,
                 'description': 'Enable verbose output'
+            },
+            'no_cache': {
+                'type': 'boolean',
+                'default': False,
+                'description': 'Always generate; skip re-serving a stored response for a similar description (seeded requests never use it)'
             }
         },
         'examples': {
@@ -276,39 +359,55 @@ def info():
             'full': '/generate?description=DevOps%20Engineer&artifacts=10&temperature=0.8&model=gemini-3-pro-preview&seed=42&verbose=true',
             'categories': '/generate?description=Full%20Stack%20Developer&categories=code,docs,config'
         }
-    }), 200
+    }
 
 
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
 
-@app.errorhandler(400)
-def bad_request(error):
-    """Handle 400 Bad Request"""
-    return jsonify({
-        'error': 'Bad Request',
-        'message': str(error.description)
-    }), 400
+# Error messages for out-of-range query parameters
+RANGE_ERRORS = {
+    'artifacts': "artifacts must be between 1 and 100",
+    'temperature': "temperature must be between 0.0 and 1.0",
+}
+
+
+@app.exception_handler(RequestValidationError)
+async def bad_request(request: Request, exc: RequestValidationError):
+    """Handle 400 Bad Request (invalid query parameters)"""
+    # Same {'error': <message>} shape as the other parameter errors
+    err = exc.errors()[0]
+    param = err['loc'][-1]
+    if err['type'] in ('greater_than_equal', 'less_than_equal') and param in RANGE_ERRORS:
+        message = RANGE_ERRORS[param]
+    else:
+        message = f"{param}: {err['msg']}"
+    return JSONResponse({'error': message}, status_code=400)
 
 
-@app.errorhandler(404)
-def not_found(error):
-    """Handle 404 Not Found"""
-    return jsonify({
-        'error': 'Not Found',
-        'message': 'The requested endpoint does not exist',
-        'available_endpoints': ['/generate', '/health', '/info']
-    }), 404
+@app.exception_handler(StarletteHTTPException)
+async def http_error(request: Request, exc: StarletteHTTPException):
+    """Handle 404 Not Found and other HTTP errors"""
+    if exc.status_code == 404:
+        return JSONResponse({
+            'error': 'Not Found',
+            'message': 'The requested endpoint does not exist',
+            'available_endpoints': ['/generate', '/health', '/info']
+        }, status_code=404)
+    return JSONResponse({
+        'error': exc.detail,
+        'message': str(exc.detail)
+    }, status_code=exc.status_code)
 
 
-@app.errorhandler(500)
-def internal_error(error):
+@app.exception_handler(Exception)
+async def internal_error(request: Request, exc: Exception):
     """Handle 500 Internal Server Error"""
-    return jsonify({
+    return JSONResponse({
         'error': 'Internal Server Error',
-        'message': str(error)
-    }), 500
+        'message': str(exc)
+    }, status_code=500)
 
 
 # ============================================================================
@@ -316,9 +415,16 @@ def internal_error(error):
 # ============================================================================
 
 if __name__ == '__main__':
-    app.run(
+    if os.getenv('DEV') != '1':
+        raise SystemExit(
+            "Use gunicorn in production (see Procfile), or set DEV=1 for the local dev server"
+        )
+
+    import uvicorn
+
+    uvicorn.run(
+        'app:app',
         host='0.0.0.0',
         port=5000,
-        debug=True,
-        threaded=True
+        reload=True,
     )
\ No newline at end of file
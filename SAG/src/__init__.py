@@ -5,20 +5,29 @@ Artifact Persona Generator - Main package
 __version__ = "0.1.0"
 __author__ = "PersonaGen"
 
-from .models import Artifact, PersonaContext, GenerationConfig
-from .persona import PersonaBuilder
-from .persistence import SQLiteDB
-from .gemini_provider import GeminiProvider
-from .prompts import PromptFactory
-from .batcher import BatchGenerator
+from importlib import import_module
 
-__all__ = [
-    "Artifact",
-    "PersonaContext",
-    "GenerationConfig",
-    "PersonaBuilder",
-    "SQLiteDB",
-    "GeminiProvider",
-    "PromptFactory",
-    "BatchGenerator",
-]
+# Public name -> defining submodule. Submodules are imported on first
+# access so that importing one of them (e.g. in a validation worker)
+# does not pull in the provider SDKs.
+_EXPORTS = {
+    "Artifact": ".models",
+    "PersonaContext": ".models",
+    "GenerationConfig": ".models",
+    "PersonaBuilder": ".persona",
+    "SQLiteDB": ".persistence",
+    "GeminiProvider": ".gemini_provider",
+    "PromptFactory": ".prompts",
+    "BatchGenerator": ".batcher",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
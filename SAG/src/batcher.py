@@ -2,7 +2,10 @@
 Batch generation with async support
 """
 
+import os
 import asyncio
+import hashlib
+from datetime import datetime, timedelta
 from typing import List, Optional
 from .models import Artifact, PersonaContext, GenerationConfig
 from .persistence import SQLiteDB
@@ -10,19 +13,36 @@ from .gemini_provider import GeminiProvider
 from .prompts import PromptFactory
 
 
+DEFAULT_MAX_CONCURRENT = 8
+DEFAULT_SHARD_SIZE = 5
+PROMPT_CACHE_TTL = timedelta(hours=24)
+# Only (near-)greedy sampling is reproducible enough to replay a result
+PROMPT_CACHE_MAX_TEMPERATURE = 0.01
+
+
 class BatchGenerator:
     """Generate artifacts in batches with concurrency control"""
 
-    def __init__(self, db: Optional[SQLiteDB] = None, max_concurrent: int = 3):
+    def __init__(
+        self,
+        db: Optional[SQLiteDB] = None,
+        max_concurrent: Optional[int] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+    ):
         """
         Initialize batch generator
         
         Args:
             db: SQLiteDB instance for persistence
-            max_concurrent: Max concurrent requests
+            max_concurrent: Max concurrent requests (default: SAG_MAX_CONCURRENT env var or 8)
+            shard_size: Max artifacts requested per Gemini call
         """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("SAG_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT))
+
         self.db = db or SQLiteDB()
         self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.shard_size = shard_size
         self.prompt_factory = PromptFactory()
 
     async def generate_batch(
@@ -42,9 +62,64 @@ class BatchGenerator:
         Returns:
             List of generated Artifacts
         """
-        # Build prompt
-        prompt = self.prompt_factory.build_generation_prompt(persona, config)
+        # Split the request into shards that are generated concurrently
+        sizes = [
+            min(self.shard_size, config.num_artifacts - start)
+            for start in range(0, config.num_artifacts, self.shard_size)
+        ]
+        tasks = [
+            self._generate_shard(
+                persona,
+                config.model_copy(update={"num_artifacts": size}),
+                provider,
+                shard_index=index if len(sizes) > 1 else None,
+            )
+            for index, size in enumerate(sizes)
+        ]
+        results = await asyncio.gather(*tasks)
+        return [artifact for result in results for artifact in result]
+
+    async def _generate_shard(
+        self,
+        persona: PersonaContext,
+        config: GenerationConfig,
+        provider: GeminiProvider,
+        shard_index: Optional[int] = None,
+    ) -> List[Artifact]:
+        """
+        Generate one shard of a batch
         
+        Args:
+            persona: PersonaContext
+            config: GenerationConfig sized for this shard
+            provider: GeminiProvider instance
+            shard_index: Position of this shard within the batch
+            
+        Returns:
+            List of generated Artifacts
+        """
+        prompt = self.prompt_factory.build_generation_prompt(persona, config, shard_index=shard_index)
+
+        # Identical prompt and greedy sampling: return the artifacts stored
+        # for the earlier result instead of generating (and storing) copies
+        prompt_hash = None
+        if config.temperature <= PROMPT_CACHE_MAX_TEMPERATURE:
+            prompt_hash = hashlib.blake2b(
+                f"{config.temperature}\0{config.max_tokens}\0{prompt}".encode("utf-8"),
+                digest_size=16,
+            ).hexdigest()
+            cached_ids = await asyncio.to_thread(
+                self.db.get_prompt_cache,
+                prompt_hash,
+                provider.model,
+                datetime.now() - PROMPT_CACHE_TTL,
+            )
+            if cached_ids:
+                # Only artifacts that passed validation were stored
+                cached = await asyncio.to_thread(self.db.get_artifacts_by_ids, cached_ids)
+                if cached:
+                    return cached
+
         # Call Gemini (throttled by semaphore)
         async with self.semaphore:
             artifacts_data = await asyncio.to_thread(
@@ -70,6 +145,13 @@ class BatchGenerator:
             except Exception as e:
                 print(f"Error creating artifact: {e}")
 
+        if prompt_hash and artifacts:
+            await asyncio.to_thread(
+                self.db.put_prompt_cache,
+                prompt_hash,
+                provider.model,
+                [artifact.artifact_id for artifact in artifacts],
+            )
         return artifacts
 
     async def generate_multiple_personas(
@@ -96,10 +178,6 @@ class BatchGenerator:
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        total = 0
-        for result in results:
-            if isinstance(result, list):
-                count = self.db.insert_artifacts_batch(result)
-                total += count
-
-        return total
+        # Persist every persona's artifacts in one transaction
+        successful = [result for result in results if isinstance(result, list)]
+        return self.db.bulk_insert_artifacts(successful)
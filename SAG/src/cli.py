@@ -4,7 +4,8 @@ Command-line interface for the persona generator
 
 import argparse
 import asyncio
-import json
+import logging
+import orjson
 from pathlib import Path
 from .models import GenerationConfig
 from .persona import PersonaBuilder
@@ -14,6 +15,9 @@ from .batcher import BatchGenerator
 from .postprocessor import PostProcessor
 
 
+logger = logging.getLogger("sag")
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -76,6 +80,11 @@ def main():
     
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(message)s",
+    )
+
     # Parse categories
     categories = [c.strip() for c in args.categories.split(",")]
 
@@ -89,16 +98,14 @@ def main():
     )
 
     # Build persona
-    if args.verbose:
-        print(f"[*] Building persona from: {args.description}")
+    logger.info("[*] Building persona from: %s", args.description)
     
     builder = PersonaBuilder()
     persona = builder.enrich(args.description, seed=args.seed)
     
-    if args.verbose:
-        print(f"[+] Persona: {persona.name} ({persona.slug})")
-        print(f"[+] Role: {persona.role}")
-        print(f"[+] Company: {persona.company}")
+    logger.info("[+] Persona: %s (%s)", persona.name, persona.slug)
+    logger.info("[+] Role: %s", persona.role)
+    logger.info("[+] Company: %s", persona.company)
 
     # Try to generate artifacts
     try:
@@ -108,8 +115,7 @@ def main():
         batch_gen = BatchGenerator(db)
         postprocessor = PostProcessor(db)
 
-        if args.verbose:
-            print(f"[*] Generating {args.artifacts} artifacts...")
+        logger.info("[*] Generating %d artifacts...", args.artifacts)
 
         # Generate batch
         async def generate():
@@ -117,24 +123,20 @@ def main():
 
         artifacts = asyncio.run(generate())
 
-        if args.verbose:
-            print(f"[+] Generated {len(artifacts)} artifacts")
+        logger.info("[+] Generated %d artifacts", len(artifacts))
 
         # Post-process
-        if args.verbose:
-            print(f"[*] Validating artifacts...")
+        logger.info("[*] Validating artifacts...")
         
         success, failed = postprocessor.process_batch(artifacts)
         
-        if args.verbose:
-            print(f"[+] Persisted {success} artifacts ({failed} invalid)")
+        logger.info("[+] Persisted %d artifacts (%d invalid)", success, failed)
 
         # Export if requested
         if args.output:
-            with open(args.output, "w") as f:
-                json.dump([a.to_dict() for a in artifacts], f, indent=2)
-            if args.verbose:
-                print(f"[+] Exported to {args.output}")
+            with open(args.output, "wb") as f:
+                f.write(orjson.dumps([a.to_dict() for a in artifacts], option=orjson.OPT_INDENT_2))
+            logger.info("[+] Exported to %s", args.output)
 
         # Check if any artifacts were actually generated
         if success > 0:
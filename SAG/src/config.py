@@ -8,5 +8,6 @@ DEPENDENCIES = [
     "google-generativeai>=0.3.0",
     "langchain>=0.1.0",
     "langchain-core>=0.1.0",
-    "langchain-google-genai>=0.0.1",
+    "langchain-google-genai>=2.0.1",
+    "orjson>=3.9.0",
 ]
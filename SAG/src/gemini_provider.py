@@ -3,13 +3,16 @@ Google Gemini provider with LangChain integration
 """
 
 import os
+import re
 import json
-from typing import List, Optional, Dict
+import logging
+from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
+import google.generativeai as genai
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
-from .models import Artifact, GenerationConfig
+from .models import Artifact, ArtifactOut, GenerationConfig
 
 # Load .env file from src directory
 env_path = Path(__file__).parent / ".env"
@@ -21,6 +24,43 @@ parent_env_path = Path(__file__).parent.parent / ".env"
 if parent_env_path.exists():
     load_dotenv(parent_env_path)
 
+logger = logging.getLogger("sag")
+
+# Embedding model used for semantic response caching
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+# Gemini structured output: a JSON array of ArtifactOut objects
+ARTIFACT_RESPONSE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in ArtifactOut.model_fields},
+        "required": list(ArtifactOut.model_fields),
+    },
+}
+
+# Boundary between two objects of a JSON array ("}, {")
+_OBJECT_SPLIT_RE = re.compile(r"\}\s*,\s*\{")
+
+# strict=False accepts the literal newlines/tabs Gemini leaves inside
+# string values
+_DECODER = json.JSONDecoder(strict=False)
+_ARRAY_SEPARATORS = " \t\n\r,"
+
+# "field": "value" pairs for every artifact field, in a single alternation
+_FIELD_RE = re.compile(
+    r'"(title|category|file_extension|content)"\s*:\s*"((?:[^"\\]|\\.)*)"',
+    re.DOTALL,
+)
+
+
+def _unescape(value: str) -> str:
+    """Decode JSON string escapes (\\n, \\", \\uXXXX, ...) in a raw field value"""
+    try:
+        return json.loads(f'"{value}"', strict=False)
+    except json.JSONDecodeError:
+        return value
+
 
 class GeminiProvider:
     """LangChain wrapper for Google Gemini API"""
@@ -47,6 +87,7 @@ class GeminiProvider:
 
         self.api_key = api_key
         self.model = model
+        self._llm_cache: Dict[tuple, ChatGoogleGenerativeAI] = {}
         self._init_model()
 
     def _init_model(self):
@@ -57,6 +98,40 @@ class GeminiProvider:
             temperature=0.75,
         )
 
+    def _get_llm(self, temperature: float, max_tokens: int) -> ChatGoogleGenerativeAI:
+        """Return a cached LLM client for the given sampling settings"""
+        key = (temperature, max_tokens)
+        llm = self._llm_cache.get(key)
+        if llm is None:
+            llm = ChatGoogleGenerativeAI(
+                model=self.model,
+                google_api_key=self.api_key,
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                response_mime_type="application/json",
+                response_schema=ARTIFACT_RESPONSE_SCHEMA,
+            )
+            llm = self._llm_cache.setdefault(key, llm)
+        return llm
+
+    def embed(self, text: str) -> List[float]:
+        """
+        Embed text for semantic similarity lookups
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        genai.configure(api_key=self.api_key)
+        result = genai.embed_content(
+            model=EMBEDDING_MODEL,
+            content=text,
+            task_type="semantic_similarity",
+        )
+        return result["embedding"]
+
     def generate_artifacts(
         self,
         prompt: str,
@@ -77,13 +152,8 @@ class GeminiProvider:
             List of generated artifact dictionaries
         """
         try:
-            # Create the LLM with specific temperature
-            llm = ChatGoogleGenerativeAI(
-                model=self.model,
-                google_api_key=self.api_key,
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-            )
+            # Reuse the LLM for this temperature/token budget
+            llm = self._get_llm(temperature, max_tokens)
 
             # Call the model
             response = llm.invoke([HumanMessage(content=prompt)])
@@ -94,7 +164,7 @@ class GeminiProvider:
             
             return artifacts
         except Exception as e:
-            print(f"Error generating artifacts: {e}")
+            logger.warning("Error generating artifacts: %s", e)
             return []
 
     def _parse_artifacts(self, content: str, num_artifacts: int) -> List[Dict]:
@@ -108,8 +178,6 @@ class GeminiProvider:
         Returns:
             List of artifact dictionaries
         """
-        import re
-        
         artifacts = []
         
         # Convert content to string if needed (handle LangChain message objects)
@@ -123,8 +191,8 @@ class GeminiProvider:
         
         try:
             # Find the JSON array in the response
-            if "[" not in content or "]" not in content:
-                print(f"DEBUG: No JSON array found in response. First 300 chars: {content[:300]}")
+            if "[" not in content:
+                logger.debug("No JSON array found in response. First 300 chars: %s", content[:300])
                 return artifacts
             
             # Extract from first [ to last ]
@@ -132,137 +200,84 @@ class GeminiProvider:
             end_idx = content.rfind("]") + 1
             json_str = content[start_idx:end_idx]
             
-            # Try direct parsing first
             try:
-                data = json.loads(json_str)
+                data = _DECODER.decode(json_str)
                 if isinstance(data, list):
                     artifacts = data[:num_artifacts]
                     return artifacts
             except json.JSONDecodeError:
                 pass
             
-            # Parse JSON array by finding individual objects while respecting brace nesting
-            print("DEBUG: Using brace-matching artifact extraction")
-            
-            artifacts_raw = []
-            depth = 0
-            current_obj = []
-            in_string = False
-            escape_next = False
-            
-            for char in json_str:
-                if escape_next:
-                    current_obj.append(char)
-                    escape_next = False
-                    continue
-                
-                if char == '\\' and in_string:
-                    current_obj.append(char)
-                    escape_next = True
-                    continue
-                
-                if char == '"':
-                    in_string = not in_string
-                    current_obj.append(char)
-                    continue
-                
-                if not in_string:
-                    if char == '{':
-                        if depth == 0:
-                            current_obj = []  # Start new object
-                        depth += 1
-                        current_obj.append(char)
-                    elif char == '}':
-                        depth -= 1
-                        current_obj.append(char)
-                        if depth == 0 and current_obj:
-                            artifacts_raw.append(''.join(current_obj))
-                            current_obj = []
-                    else:
-                        if depth > 0:
-                            current_obj.append(char)
-                else:
-                    current_obj.append(char)
-            
-            # Process each extracted object
-            for obj_str in artifacts_raw:
-                if len(artifacts) >= num_artifacts:
-                    break
-                
-                # Try to fix and parse as JSON first
-                try:
-                    # Fix unescaped newlines within strings
-                    def fix_json_string(s):
-                        result = []
-                        in_string = False
-                        escape_next = False
-                        for char in s:
-                            if escape_next:
-                                result.append(char)
-                                escape_next = False
-                            elif char == '\\':
-                                result.append(char)
-                                escape_next = True
-                            elif char == '"':
-                                result.append(char)
-                                in_string = not in_string
-                            elif char in '\n\r\t' and in_string:
-                                # Escape literal whitespace in strings
-                                if char == '\n':
-                                    result.append('\\n')
-                                elif char == '\r':
-                                    result.append('\\r')
-                                elif char == '\t':
-                                    result.append('\\t')
-                            else:
-                                result.append(char)
-                        return ''.join(result)
-                    
-                    fixed_obj = fix_json_string(obj_str)
-                    obj_data = json.loads(fixed_obj)
-                    
-                    if 'title' in obj_data and 'category' in obj_data and 'content' in obj_data:
-                        artifacts.append({
-                            "title": obj_data.get('title', ''),
-                            "category": obj_data.get('category', ''),
-                            "file_extension": obj_data.get('file_extension', ''),
-                            "content": obj_data.get('content', '')
-                        })
-                    continue
-                except json.JSONDecodeError:
-                    pass
-                
-                # Fallback: manual field extraction using regex
-                try:
-                    title_match = re.search(r'"title"\s*:\s*"([^"]*(?:\\"[^"]*)*)"', obj_str)
-                    category_match = re.search(r'"category"\s*:\s*"([^"]*)"', obj_str)
-                    ext_match = re.search(r'"file_extension"\s*:\s*"([^"]*)"', obj_str)
-                    content_match = re.search(r'"content"\s*:\s*"((?:[^"\\]|\\.|\n|\r|\t)*?)"(?:\s*[,}])', obj_str)
-                    
-                    if title_match and category_match and content_match:
-                        content_text = content_match.group(1)
-                        # Unescape
-                        content_text = content_text.replace('\\n', '\n')
-                        content_text = content_text.replace('\\t', '\t')
-                        content_text = content_text.replace('\\r', '\r')
-                        content_text = content_text.replace('\\"', '"')
-                        content_text = content_text.replace('\\\\', '\\')
-                        
-                        artifacts.append({
-                            "title": title_match.group(1),
-                            "category": category_match.group(1),
-                            "file_extension": ext_match.group(1) if ext_match else '',
-                            "content": content_text
-                        })
-                except:
-                    pass
+            # Fallback: keep every complete object (e.g. of a truncated
+            # response) and salvage fields from the malformed tail only
+            artifacts, tail = self._decode_objects(content[start_idx:], num_artifacts)
+            if tail:
+                logger.debug("Using regex artifact extraction")
+                artifacts += self._extract_fields_fallback(tail, num_artifacts - len(artifacts))
             
             if artifacts:
-                print(f"DEBUG: Successfully extracted {len(artifacts)} artifacts")
+                logger.debug("Successfully extracted %d artifacts", len(artifacts))
                 return artifacts
                 
         except Exception as e:
-            print(f"Failed to parse JSON from response: {e}")
-            print(f"DEBUG: Response content (first 500 chars): {content[:500]}")
+            logger.warning("Failed to parse JSON from response: %s", e)
+            logger.debug("Response content (first 500 chars): %s", content[:500])
         
         return artifacts
+
+    @staticmethod
+    def _decode_objects(raw: str, limit: int) -> Tuple[List[Dict], str]:
+        """
+        Decode the objects of a JSON array one at a time
+        
+        Args:
+            raw: JSON array text, possibly malformed or truncated
+            limit: Max number of artifacts to return
+            
+        Returns:
+            Decoded artifact dictionaries, and the text from the first
+            undecodable object on ("" if there is none)
+        """
+        artifacts = []
+        idx = 1  # past the opening "["
+        end = len(raw)
+        while len(artifacts) < limit:
+            while idx < end and raw[idx] in _ARRAY_SEPARATORS:
+                idx += 1
+            if idx >= end or raw[idx] == "]":
+                break
+            try:
+                obj, idx = _DECODER.raw_decode(raw, idx)
+            except json.JSONDecodeError:
+                return artifacts, raw[idx:]
+            if isinstance(obj, dict):
+                artifacts.append(obj)
+        return artifacts, ""
+
+    @staticmethod
+    def _extract_fields_fallback(raw: str, limit: int) -> List[Dict]:
+        """
+        Extract artifact fields with regexes from malformed JSON
+        
+        Args:
+            raw: Unparseable JSON array text
+            limit: Max number of artifacts to return
+            
+        Returns:
+            List of artifact dictionaries
+        """
+        artifacts = []
+        for obj_str in _OBJECT_SPLIT_RE.split(raw):
+            if len(artifacts) >= limit:
+                break
+
+            # One pass over the object picks up every field we care about
+            fields = {m.group(1): m.group(2) for m in _FIELD_RE.finditer(obj_str)}
+            if 'title' in fields and 'category' in fields and 'content' in fields:
+                artifacts.append({
+                    "title": _unescape(fields['title']),
+                    "category": _unescape(fields['category']),
+                    "file_extension": _unescape(fields.get('file_extension', '')),
+                    "content": _unescape(fields['content'])
+                })
+        return artifacts
@@ -2,7 +2,7 @@
 Data models for the persona generator system
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import uuid4
@@ -18,8 +18,8 @@ class GenerationConfig(BaseModel):
     categories: List[str] = Field(default_factory=lambda: ["code", "config", "docs"])
     model: str = "gemini-2.5-flash"
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "num_artifacts": 25,
                 "temperature": 0.75,
@@ -27,12 +27,13 @@ class GenerationConfig(BaseModel):
                 "categories": ["code", "config"]
             }
         }
+    )
 
 
 class PersonaContext(BaseModel):
     """Rich context for a single persona"""
     
-    persona_id: str = Field(default_factory=lambda: str(uuid4())[:8])
+    persona_id: str = Field(default_factory=lambda: uuid4().hex[:8])
     name: str
     slug: str
     description: str
@@ -46,8 +47,14 @@ class PersonaContext(BaseModel):
     email: str = ""
     github_username: str = ""
 
-    class Config:
-        json_schema_extra = {
+    # Rendered once; the model is frozen so it can never go stale
+    _context_string: Optional[str] = PrivateAttr(default=None)
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        str_strip_whitespace=True,
+        json_schema_extra={
             "example": {
                 "name": "Alice Johnson",
                 "slug": "alice-johnson",
@@ -55,24 +62,28 @@ class PersonaContext(BaseModel):
                 "company": "TechCorp",
                 "location": "San Francisco, CA"
             }
-        }
+        },
+    )
 
     def to_context_string(self) -> str:
         """Convert to string for prompt injection"""
-        return f"""
+        if self._context_string is None:
+            tech_stack = ", ".join(self.tech_stack)
+            self._context_string = f"""
 Persona: {self.name} ({self.slug})
 Role: {self.role}
 Company: {self.company}
 Experience: {self.experience_years} years
-Tech Stack: {', '.join(self.tech_stack)}
+Tech Stack: {tech_stack}
 Location: {self.location}
 """
+        return self._context_string
 
 
 class Artifact(BaseModel):
     """Single generated artifact"""
     
-    artifact_id: str = Field(default_factory=lambda: str(uuid4()))
+    artifact_id: str = Field(default_factory=lambda: uuid4().hex)
     persona_slug: str
     category: str  # "code", "config", "docs", etc.
     title: str
@@ -82,17 +93,21 @@ class Artifact(BaseModel):
     modified_at: datetime = Field(default_factory=datetime.now)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # No whitespace stripping here: content must be stored byte-for-byte
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        data = self.dict()
-        data["created_at"] = self.created_at.isoformat()
-        data["modified_at"] = self.modified_at.isoformat()
-        return data
+        return self.model_dump(mode="json")
+
+
+class ArtifactOut(BaseModel):
+    """Artifact as returned by the model (structured output schema)"""
+    
+    title: str
+    category: str
+    file_extension: str
+    content: str
 
 
 class EvaluationMetrics(BaseModel):
@@ -103,9 +118,4 @@ class EvaluationMetrics(BaseModel):
     success_count: int
     validity_rate: float
     diversity_score: float
-    timestamp: datetime = Field(default_factory=datetime.now)
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
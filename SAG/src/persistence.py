@@ -3,12 +3,42 @@ SQLite persistence layer for artifacts
 """
 
 import sqlite3
+import threading
 from pathlib import Path
 from contextlib import contextmanager
-from typing import List, Optional, Dict, Any
-import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+import orjson
+from datetime import datetime
 from .models import Artifact
 
+# Shared by every insert path so the connection's statement cache
+# prepares it only once
+_INSERT_SQL = """
+    INSERT INTO artifacts
+    (id, persona_slug, category, title, content, file_extension,
+     created_at, modified_at, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_ARTIFACTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS artifacts (
+        id TEXT PRIMARY KEY,
+        persona_slug TEXT NOT NULL,
+        category TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        file_extension TEXT,
+        created_at INTEGER,
+        modified_at INTEGER,
+        metadata BLOB,
+        FOREIGN KEY (persona_slug) REFERENCES personas(slug)
+    )
+"""
+
+
+# Ids bound per "IN (...)" query, well under SQLite's parameter limit
+_ID_CHUNK_SIZE = 500
+
 
 class SQLiteDB:
     """SQLite database wrapper for artifacts"""
@@ -22,28 +52,34 @@ class SQLiteDB:
         """
         self.db_path = db_path
         self.is_memory = db_path == ":memory:"
-        self._memory_conn = None
+        self._lock = threading.RLock()
+
+        # One long-lived connection; transactions are managed explicitly
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._apply_pragmas()
         
         # Initialize schema
         self._init_schema()
 
+    def _apply_pragmas(self):
+        """Tune the connection for bulk writes"""
+        # cache_spill=OFF keeps a batch's dirty pages in memory until COMMIT
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA busy_timeout=5000;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-65536;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_spill=OFF;
+        """)
+
     def _init_schema(self):
         """Create tables if they don't exist"""
         with self.conn() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS artifacts (
-                    id TEXT PRIMARY KEY,
-                    persona_slug TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    file_extension TEXT,
-                    created_at TEXT,
-                    modified_at TEXT,
-                    metadata TEXT,
-                    FOREIGN KEY (persona_slug) REFERENCES personas(slug)
-                )
-            """)
+            conn.execute(_ARTIFACTS_TABLE_SQL)
+            self._migrate_legacy_artifacts(conn)
             
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS personas (
@@ -58,47 +94,96 @@ class SQLiteDB:
                 )
             """)
             
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    query TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    response BLOB NOT NULL,
+                    created_at INTEGER
+                )
+            """)
+            
+            # Entries used to hold raw artifact data; they are only a cache,
+            # so an old-style table is simply rebuilt
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(prompt_cache)")}
+            if "artifacts" in columns:
+                conn.execute("DROP TABLE prompt_cache")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS prompt_cache (
+                    prompt_hash TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    artifact_ids BLOB NOT NULL,
+                    created_at INTEGER
+                )
+            """)
+            
             # Create indices
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_persona_slug ON artifacts(persona_slug)")
+            # (persona_slug, created_at DESC) serves the per-persona listing without a sort
+            # and supersedes the old single-column persona index
+            conn.execute("DROP INDEX IF EXISTS idx_persona_slug")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_persona_created ON artifacts(persona_slug, created_at DESC)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON artifacts(category)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON artifacts(created_at)")
             
             conn.commit()
 
+    def _migrate_legacy_artifacts(self, conn: sqlite3.Connection):
+        """Rebuild an artifacts table created with ISO-8601 TEXT timestamps"""
+        columns = {row["name"]: row["type"] for row in conn.execute("PRAGMA table_info(artifacts)")}
+        if columns.get("created_at", "").upper() == "INTEGER":
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Renaming carries the old indices along; they go with the DROP
+            # and are recreated on the new table by _init_schema
+            conn.execute("ALTER TABLE artifacts RENAME TO artifacts_legacy")
+            conn.execute(_ARTIFACTS_TABLE_SQL)
+            rows = conn.execute("""
+                SELECT id, persona_slug, category, title, content, file_extension,
+                       created_at, modified_at, metadata
+                FROM artifacts_legacy
+            """)
+            conn.executemany(_INSERT_SQL, (
+                (
+                    *row[:6],
+                    self._legacy_epoch_us(row["created_at"]),
+                    self._legacy_epoch_us(row["modified_at"]),
+                    row["metadata"].encode("utf-8") if isinstance(row["metadata"], str) else row["metadata"],
+                )
+                for row in rows
+            ))
+            conn.execute("DROP TABLE artifacts_legacy")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
     @contextmanager
     def conn(self):
-        """Context manager for database connections"""
-        if self.is_memory:
-            if self._memory_conn is None:
-                self._memory_conn = sqlite3.connect(":memory:")
-            yield self._memory_conn
-        else:
-            connection = sqlite3.connect(self.db_path)
-            try:
-                yield connection
-            finally:
-                connection.close()
+        """Context manager for the shared database connection"""
+        with self._lock:
+            yield self._conn
+
+    def close(self):
+        """Close the database connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def insert_artifact(self, artifact: Artifact) -> bool:
         """Insert single artifact"""
         try:
             with self.conn() as conn:
-                conn.execute("""
-                    INSERT INTO artifacts 
-                    (id, persona_slug, category, title, content, file_extension, 
-                     created_at, modified_at, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    artifact.artifact_id,
-                    artifact.persona_slug,
-                    artifact.category,
-                    artifact.title,
-                    artifact.content,
-                    artifact.file_extension,
-                    artifact.created_at.isoformat(),
-                    artifact.modified_at.isoformat(),
-                    json.dumps(artifact.metadata),
-                ))
+                conn.execute(_INSERT_SQL, self._artifact_to_row(artifact))
                 conn.commit()
                 return True
         except Exception as e:
@@ -106,48 +191,81 @@ class SQLiteDB:
             return False
 
     def insert_artifacts_batch(self, artifacts: List[Artifact]) -> int:
-        """Insert multiple artifacts"""
-        count = 0
+        """Insert multiple artifacts in a single transaction"""
+        if not artifacts:
+            return 0
+        return self.insert_artifacts_stream(artifacts)
+
+    def insert_artifacts_stream(self, artifacts: Iterable[Artifact]) -> int:
+        """Insert artifacts from any iterable in a single transaction"""
+        # executemany pulls rows lazily, so no parameter list is materialized
+        rows = (self._artifact_to_row(artifact) for artifact in artifacts)
+
         with self.conn() as conn:
-            for artifact in artifacts:
-                try:
-                    conn.execute("""
-                        INSERT INTO artifacts 
-                        (id, persona_slug, category, title, content, file_extension, 
-                         created_at, modified_at, metadata)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        artifact.artifact_id,
-                        artifact.persona_slug,
-                        artifact.category,
-                        artifact.title,
-                        artifact.content,
-                        artifact.file_extension,
-                        artifact.created_at.isoformat(),
-                        artifact.modified_at.isoformat(),
-                        json.dumps(artifact.metadata),
-                    ))
-                    count += 1
-                except Exception as e:
-                    print(f"Error inserting artifact: {e}")
-            conn.commit()
-        return count
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.executemany(_INSERT_SQL, rows)
+                conn.execute("COMMIT")
+            except Exception as e:
+                # BEGIN itself fails (e.g. database is locked) with no transaction open
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print(f"Error inserting artifacts batch: {e}")
+                return 0
+        return cursor.rowcount
+
+    def bulk_insert_artifacts(self, results: List[List[Artifact]]) -> int:
+        """Insert several batches of artifacts in a single transaction"""
+        artifacts = [artifact for result in results for artifact in result]
+        # Artifacts replayed from the prompt cache are already stored
+        existing = self.get_existing_artifact_ids([artifact.artifact_id for artifact in artifacts])
+        return len(existing) + self.insert_artifacts_batch(
+            [artifact for artifact in artifacts if artifact.artifact_id not in existing]
+        )
+
+    def get_existing_artifact_ids(self, artifact_ids: List[str]) -> Set[str]:
+        """Get which of the given artifact ids are already stored"""
+        existing = set()
+        with self.conn() as conn:
+            for start in range(0, len(artifact_ids), _ID_CHUNK_SIZE):
+                chunk = artifact_ids[start:start + _ID_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                existing.update(
+                    row[0] for row in conn.execute(
+                        f"SELECT id FROM artifacts WHERE id IN ({placeholders})", chunk
+                    )
+                )
+        return existing
+
+    def get_artifacts_by_ids(self, artifact_ids: List[str]) -> List[Artifact]:
+        """Get stored artifacts by id, in the given order; missing ids are skipped"""
+        found = {}
+        with self.conn() as conn:
+            for start in range(0, len(artifact_ids), _ID_CHUNK_SIZE):
+                chunk = artifact_ids[start:start + _ID_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(f"""
+                    SELECT id, persona_slug, category, title, content, file_extension,
+                           created_at, modified_at, metadata
+                    FROM artifacts
+                    WHERE id IN ({placeholders})
+                """, chunk)
+                found.update((row["id"], self._row_to_artifact(row)) for row in cursor)
+        return [found[artifact_id] for artifact_id in artifact_ids if artifact_id in found]
 
     def get_artifacts_by_persona(self, persona_slug: str) -> List[Artifact]:
         """Get all artifacts for a persona"""
         with self.conn() as conn:
-            rows = conn.execute("""
+            cursor = conn.execute("""
                 SELECT id, persona_slug, category, title, content, file_extension,
                        created_at, modified_at, metadata
                 FROM artifacts
                 WHERE persona_slug = ?
                 ORDER BY created_at DESC
-            """, (persona_slug,)).fetchall()
+            """, (persona_slug,))
             
-            artifacts = []
-            for row in rows:
-                artifacts.append(self._row_to_artifact(row))
-            return artifacts
+            # Convert while iterating the cursor instead of materializing all rows first
+            return [self._row_to_artifact(row) for row in cursor]
 
     def get_all_personas(self) -> List[str]:
         """Get all persona slugs"""
@@ -158,26 +276,157 @@ class SQLiteDB:
             """).fetchall()
             return [row[0] for row in rows]
 
+    def insert_cached_response(
+        self,
+        query: str,
+        scope: str,
+        embedding: bytes,
+        response: Dict[str, Any],
+    ) -> Optional[int]:
+        """Store a /generate response with the embedding of its query"""
+        try:
+            with self.conn() as conn:
+                cursor = conn.execute("""
+                    INSERT INTO response_cache (query, scope, embedding, response, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (query, scope, embedding, orjson.dumps(response), self._to_epoch_us(datetime.now())))
+                return cursor.lastrowid
+        except Exception as e:
+            print(f"Error caching response: {e}")
+            return None
+
+    def get_response_cache_embeddings(self, min_created_at: datetime) -> List[tuple]:
+        """Get (id, scope, embedding, created_at) for cached responses newer than min_created_at, oldest first"""
+        with self.conn() as conn:
+            return conn.execute("""
+                SELECT id, scope, embedding, created_at FROM response_cache
+                WHERE created_at > ?
+                ORDER BY id
+            """, (self._to_epoch_us(min_created_at),)).fetchall()
+
+    def delete_cached_responses(
+        self,
+        entry_ids: Iterable[int] = (),
+        before: Optional[datetime] = None,
+    ) -> int:
+        """Delete cached responses by id and/or everything older than before"""
+        try:
+            with self.conn() as conn:
+                deleted = 0
+                if before is not None:
+                    deleted += conn.execute(
+                        "DELETE FROM response_cache WHERE created_at <= ?",
+                        (self._to_epoch_us(before),),
+                    ).rowcount
+                deleted += conn.executemany(
+                    "DELETE FROM response_cache WHERE id = ?",
+                    ((entry_id,) for entry_id in entry_ids),
+                ).rowcount
+                return deleted
+        except Exception as e:
+            print(f"Error evicting cached responses: {e}")
+            return 0
+
+    def get_cached_response(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Get a cached response by id"""
+        with self.conn() as conn:
+            row = conn.execute(
+                "SELECT response FROM response_cache WHERE id = ?", (entry_id,)
+            ).fetchone()
+            return orjson.loads(row[0]) if row else None
+
+    def get_prompt_cache(
+        self,
+        prompt_hash: str,
+        model: str,
+        min_created_at: datetime,
+    ) -> Optional[List[str]]:
+        """Get the ids of the artifacts generated for a prompt, if newer than min_created_at"""
+        with self.conn() as conn:
+            row = conn.execute("""
+                SELECT artifact_ids FROM prompt_cache
+                WHERE prompt_hash = ? AND model = ? AND created_at > ?
+            """, (prompt_hash, model, self._to_epoch_us(min_created_at))).fetchone()
+            return orjson.loads(row[0]) if row else None
+
+    def put_prompt_cache(
+        self,
+        prompt_hash: str,
+        model: str,
+        artifact_ids: List[str],
+    ) -> bool:
+        """Store the ids of the artifacts generated for a prompt"""
+        try:
+            with self.conn() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO prompt_cache (prompt_hash, model, artifact_ids, created_at)
+                    VALUES (?, ?, ?, ?)
+                """, (prompt_hash, model, orjson.dumps(artifact_ids), self._to_epoch_us(datetime.now())))
+                return True
+        except Exception as e:
+            print(f"Error caching prompt result: {e}")
+            return False
+
     def delete_all(self):
         """Clear all data"""
         with self.conn() as conn:
             conn.execute("DELETE FROM artifacts")
             conn.execute("DELETE FROM personas")
+            conn.execute("DELETE FROM response_cache")
+            conn.execute("DELETE FROM prompt_cache")
             conn.commit()
 
     @staticmethod
-    def _row_to_artifact(row: tuple) -> Artifact:
+    def _to_epoch_us(value: datetime) -> int:
+        """Convert datetime to integer microseconds since the epoch"""
+        return round(value.timestamp() * 1_000_000)
+
+    @staticmethod
+    def _legacy_epoch_us(value) -> Optional[int]:
+        """Convert a timestamp from an older database to epoch microseconds"""
+        # Older databases stored ISO-8601 strings; integers written into
+        # their TEXT columns come back as digit strings
+        if not isinstance(value, str):
+            return value
+        if value.lstrip("-").isdigit():
+            return int(value)
+        return SQLiteDB._to_epoch_us(datetime.fromisoformat(value))
+
+    @staticmethod
+    def _from_epoch_us(value) -> datetime:
+        """Convert integer microseconds since the epoch to datetime"""
+        if isinstance(value, str):
+            value = SQLiteDB._legacy_epoch_us(value)
+        seconds, micros = divmod(value, 1_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=micros)
+
+    @staticmethod
+    def _artifact_to_row(artifact: Artifact) -> tuple:
+        """Convert Artifact object to database row"""
+        return (
+            artifact.artifact_id,
+            artifact.persona_slug,
+            artifact.category,
+            artifact.title,
+            artifact.content,
+            artifact.file_extension,
+            SQLiteDB._to_epoch_us(artifact.created_at),
+            SQLiteDB._to_epoch_us(artifact.modified_at),
+            orjson.dumps(artifact.metadata),
+        )
+
+    @staticmethod
+    def _row_to_artifact(row: sqlite3.Row) -> Artifact:
         """Convert database row to Artifact object"""
-        from datetime import datetime
-        
         return Artifact(
-            artifact_id=row[0],
-            persona_slug=row[1],
-            category=row[2],
-            title=row[3],
-            content=row[4],
-            file_extension=row[5],
-            created_at=datetime.fromisoformat(row[6]),
-            modified_at=datetime.fromisoformat(row[7]),
-            metadata=json.loads(row[8]) if row[8] else {},
+            artifact_id=row["id"],
+            persona_slug=row["persona_slug"],
+            category=row["category"],
+            title=row["title"],
+            content=row["content"],
+            file_extension=row["file_extension"],
+            created_at=SQLiteDB._from_epoch_us(row["created_at"]),
+            modified_at=SQLiteDB._from_epoch_us(row["modified_at"]),
+            # Older databases stored metadata as TEXT; orjson reads both
+            metadata=orjson.loads(row["metadata"]) if row["metadata"] else {},
         )
@@ -2,16 +2,22 @@
 Persona builder - enriches descriptions into rich personas
 """
 
-from typing import Optional
+from typing import Optional, Tuple
 from .models import PersonaContext
 import random
 import re
+import sys
+
+
+def _interned(*values: str) -> Tuple[str, ...]:
+    """Freeze a set of constants as a tuple of interned strings"""
+    return tuple(sys.intern(v) for v in values)
 
 
 class PersonaBuilder:
     """Builds rich personas from simple descriptions"""
 
-    ROLES = [
+    ROLES = _interned(
         "Backend Engineer",
         "Frontend Developer",
         "DevOps Engineer",
@@ -22,9 +28,14 @@ class PersonaBuilder:
         "Cloud Architect",
         "SRE",
         "Database Administrator",
-    ]
+    )
 
-    COMPANIES = [
+    # One scan for every role; the ROLES order still decides ties
+    _ROLES_LOOKUP = {r.lower(): r for r in ROLES}
+    _ROLES_RANK = {r.lower(): i for i, r in enumerate(ROLES)}
+    _ROLES_REGEX = re.compile("|".join(re.escape(r.lower()) for r in ROLES))
+
+    COMPANIES = _interned(
         "TechCorp",
         "CloudDynamics",
         "DataFlow Systems",
@@ -33,9 +44,9 @@ class PersonaBuilder:
         "InnovateTech",
         "QuantumLeap",
         "NeuralWorks",
-    ]
+    )
 
-    LOCATIONS = [
+    LOCATIONS = _interned(
         "San Francisco, CA",
         "New York, NY",
         "Austin, TX",
@@ -44,16 +55,17 @@ class PersonaBuilder:
         "Denver, CO",
         "Portland, OR",
         "Remote",
-    ]
+    )
 
     TECH_STACKS = {
-        "Backend": ["Python", "Go", "Rust", "Node.js", "Java"],
-        "Frontend": ["React", "Vue", "Angular", "TypeScript"],
-        "DevOps": ["Kubernetes", "Docker", "Terraform", "Jenkins"],
-        "Data": ["Pandas", "Spark", "SQL", "TensorFlow"],
+        "Backend": _interned("Python", "Go", "Rust", "Node.js", "Java"),
+        "Frontend": _interned("React", "Vue", "Angular", "TypeScript"),
+        "DevOps": _interned("Kubernetes", "Docker", "Terraform", "Jenkins"),
+        "Data": _interned("Pandas", "Spark", "SQL", "TensorFlow"),
     }
+    _STACK_KEYS = tuple(TECH_STACKS)
 
-    QUIRKS = [
+    QUIRKS = _interned(
         "Coffee addict",
         "Night owl",
         "Open source enthusiast",
@@ -61,7 +73,17 @@ class PersonaBuilder:
         "Podcast listener",
         "Terminal lover",
         "Documentation focused",
-    ]
+    )
+
+    FIRST_NAMES = _interned(
+        "Alice", "Bob", "Charlie", "Diana", "Eve", "Frank",
+        "Grace", "Henry", "Isabel", "Jack", "Karen", "Leo",
+    )
+
+    LAST_NAMES = _interned(
+        "Johnson", "Smith", "Williams", "Brown", "Jones",
+        "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    )
 
     def __init__(self):
         pass
@@ -81,30 +103,31 @@ class PersonaBuilder:
         Returns:
             PersonaContext with enriched data
         """
-        if seed is not None:
-            random.seed(seed)
+        # Per-call generator: concurrent requests neither share nor reseed
+        # the global RNG, so a seed always reproduces the same persona
+        rng = random.Random(seed)
 
         # Extract role from description or use random
-        role = self._extract_role(description)
+        role = self._extract_role(description, rng)
         
         # Generate name and slug
-        name = self._generate_name()
+        name = self._generate_name(rng)
         slug = self._name_to_slug(name)
 
         # Pick random attributes
-        company = random.choice(self.COMPANIES)
-        location = random.choice(self.LOCATIONS)
-        experience_years = random.randint(2, 15)
+        company = rng.choice(self.COMPANIES)
+        location = rng.choice(self.LOCATIONS)
+        experience_years = rng.randint(2, 15)
         
         # Get tech stack
-        stack_category = random.choice(list(self.TECH_STACKS.keys()))
-        tech_stack = random.sample(
+        stack_category = rng.choice(self._STACK_KEYS)
+        tech_stack = rng.sample(
             self.TECH_STACKS[stack_category],
-            k=random.randint(2, 4)
+            k=rng.randint(2, 4)
         )
         
         # Get quirks
-        quirks = random.sample(self.QUIRKS, k=random.randint(1, 3))
+        quirks = rng.sample(self.QUIRKS, k=rng.randint(1, 3))
 
         # Generate email and github
         email = f"{slug}@{company.lower().replace(' ', '')}.com"
@@ -124,34 +147,23 @@ class PersonaBuilder:
             github_username=github,
         )
 
-    def _extract_role(self, description: str) -> str:
+    def _extract_role(self, description: str, rng: random.Random) -> str:
         """Extract role from description"""
-        description_lower = description.lower()
-        
-        for role in self.ROLES:
-            if role.lower() in description_lower:
-                return role
+        matches = self._ROLES_REGEX.findall(description.lower())
+        if matches:
+            return self._ROLES_LOOKUP[min(matches, key=self._ROLES_RANK.__getitem__)]
         
         # Default to first word capitalized
         words = description.strip().split()
         if words:
             return f"{words[0].capitalize()} Engineer"
         
-        return random.choice(self.ROLES)
+        return rng.choice(self.ROLES)
 
-    def _generate_name(self) -> str:
+    def _generate_name(self, rng: random.Random) -> str:
         """Generate a random name"""
-        first_names = [
-            "Alice", "Bob", "Charlie", "Diana", "Eve", "Frank",
-            "Grace", "Henry", "Isabel", "Jack", "Karen", "Leo"
-        ]
-        last_names = [
-            "Johnson", "Smith", "Williams", "Brown", "Jones",
-            "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"
-        ]
-        
-        first = random.choice(first_names)
-        last = random.choice(last_names)
+        first = rng.choice(self.FIRST_NAMES)
+        last = rng.choice(self.LAST_NAMES)
         return f"{first} {last}"
 
     def _name_to_slug(self, name: str) -> str:
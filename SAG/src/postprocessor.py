@@ -2,13 +2,158 @@
 Post-processing and validation of generated artifacts
 """
 
-import ast
-import json
-from typing import List, Tuple
+import os
+import re
+import sys
+import hashlib
+import threading
+import multiprocessing
+import orjson
+from collections import OrderedDict
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
 from .models import Artifact
 from .persistence import SQLiteDB
 
 
+MIN_CONTENT_LENGTH = 10
+
+# Parsing holds the GIL, so very large batches are validated in worker
+# processes. Below PROCESS_POOL_MIN_BATCH (which covers every API and CLI
+# request) pool start-up and pickling cost more than they save.
+PROCESS_POOL_MIN_BATCH = 1000
+# The pool needs forkserver (the server runs threads, which fork() does not
+# copy safely); elsewhere, e.g. on Windows, batches are validated inline
+PROCESS_POOL_AVAILABLE = "forkserver" in multiprocessing.get_all_start_methods()
+# Each API worker process owns a pool, so keep it small; chunks below
+# MIN_CHUNK_SIZE cost more in pickling and transactions than they save
+MAX_POOL_WORKERS = 4
+MIN_CHUNK_SIZE = 32
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+# Validity of recently seen (extension, content) pairs. Contents longer
+# than DIGEST_THRESHOLD are keyed by a 16-byte digest to cap memory.
+VALIDATION_CACHE_SIZE = 4096
+DIGEST_THRESHOLD = 1024
+_validation_cache: "OrderedDict[tuple, bool]" = OrderedDict()
+_validation_lock = threading.Lock()
+
+# A JSON document can only start (after whitespace) with one of these
+_JSON_START_RE = re.compile(r'[ \t\n\r]*[{\["tfn\-0-9]')
+
+
+def _python_precheck(content: str) -> bool:
+    """Cheap reject for Python artifacts: nothing but whitespace"""
+    return not content.isspace()
+
+
+def _json_precheck(content: str) -> bool:
+    """Cheap reject for JSON artifacts: impossible first character"""
+    return _JSON_START_RE.match(content) is not None
+
+
+def _check_python(content: str) -> bool:
+    """Check that content compiles as a Python module"""
+    # Compiling straight to bytecode gives the same pass/fail signal
+    # without materializing a Python AST
+    try:
+        compile(content, "<artifact>", "exec", dont_inherit=True)
+    except SyntaxError:
+        return False
+    return True
+
+
+def _check_json(content: str) -> bool:
+    """Check that content parses as JSON"""
+    try:
+        orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return False
+    return True
+
+
+# extension -> (cheap pre-check, full parse); other extensions are not checked
+_VALIDATORS = {
+    ".py": (_python_precheck, _check_python),
+    ".json": (_json_precheck, _check_json),
+}
+
+
+def _is_valid(extension: str, content: str) -> bool:
+    """Syntax check for an extension; repeated artifacts skip the parser"""
+    validator = _VALIDATORS.get(extension)
+    if validator is None:
+        return True
+
+    # Cheap rejects first, before hashing or parsing
+    precheck, check = validator
+    if not precheck(content):
+        return False
+
+    if len(content) > DIGEST_THRESHOLD:
+        key = (extension, hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest())
+    else:
+        key = (extension, content)
+
+    with _validation_lock:
+        result = _validation_cache.get(key)
+        if result is not None:
+            _validation_cache.move_to_end(key)
+            return result
+
+    result = check(content)
+
+    with _validation_lock:
+        _validation_cache[key] = result
+        if len(_validation_cache) > VALIDATION_CACHE_SIZE:
+            _validation_cache.popitem(last=False)
+    return result
+
+
+def _validate(extension: str, content: str) -> bool:
+    """Validate one artifact's content; picklable for the process pool"""
+    # Check content length (content is always a str, so this covers empty)
+    if len(content) < MIN_CONTENT_LENGTH:
+        return False
+
+    # Check syntax based on file extension
+    return _is_valid(sys.intern(extension), content)
+
+
+def _validate_chunk(extensions: List[str], contents: List[str]) -> List[bool]:
+    """Validate a slice of a batch in a pool worker"""
+    # _validate inlined, with globals bound to locals for the hot loop
+    is_valid = _is_valid
+    intern = sys.intern
+    min_length = MIN_CONTENT_LENGTH
+    return [
+        len(content) >= min_length and is_valid(intern(extension), content)
+        for extension, content in zip(extensions, contents)
+    ]
+
+
+def _pool_workers() -> int:
+    """Number of validation worker processes"""
+    return min(MAX_POOL_WORKERS, os.cpu_count() or 1)
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Create the shared validation pool on first use"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # Preload this module in the fork server so workers start warm
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+            _process_pool = ProcessPoolExecutor(
+                max_workers=_pool_workers(),
+                mp_context=context,
+            )
+        return _process_pool
+
+
 class PostProcessor:
     """Validates and processes artifacts"""
 
@@ -31,24 +176,7 @@ class PostProcessor:
         Returns:
             True if valid
         """
-        # Check content length
-        if not artifact.content or len(artifact.content) < 10:
-            return False
-
-        # Check syntax based on file extension
-        if artifact.file_extension == ".py":
-            try:
-                ast.parse(artifact.content)
-            except SyntaxError:
-                return False
-        
-        elif artifact.file_extension == ".json":
-            try:
-                json.loads(artifact.content)
-            except json.JSONDecodeError:
-                return False
-
-        return True
+        return _validate(artifact.file_extension, artifact.content)
 
     def process_batch(self, artifacts: List[Artifact]) -> Tuple[int, int]:
         """
@@ -60,16 +188,49 @@ class PostProcessor:
         Returns:
             Tuple of (success_count, failure_count)
         """
-        valid_artifacts = []
-        failed = 0
+        if not artifacts:
+            return 0, 0
 
-        for artifact in artifacts:
-            if self.validate_artifact(artifact):
-                valid_artifacts.append(artifact)
-            else:
-                failed += 1
+        # Artifacts replayed from the prompt cache were validated and stored
+        # when first generated; count them as persisted without rewriting
+        existing = self.db.get_existing_artifact_ids([artifact.artifact_id for artifact in artifacts])
+        if existing:
+            artifacts = [artifact for artifact in artifacts if artifact.artifact_id not in existing]
+            if not artifacts:
+                return len(existing), 0
+
+        # Group by extension so each sub-batch runs a single parser
+        artifacts = sorted(artifacts, key=attrgetter("file_extension"))
+
+        # Ship only (extension, content) to the workers, not whole Artifacts
+        extensions = [artifact.file_extension for artifact in artifacts]
+        contents = [artifact.content for artifact in artifacts]
+
+        if len(artifacts) < PROCESS_POOL_MIN_BATCH or not PROCESS_POOL_AVAILABLE:
+            results = _validate_chunk(extensions, contents)
+
+            # Persist valid artifacts straight from the filter
+            success = self.db.insert_artifacts_stream(
+                artifact for artifact, ok in zip(artifacts, results) if ok
+            )
+            return len(existing) + success, len(results) - sum(results)
+
+        # Validate sub-batches in the pool and insert each one as soon as it
+        # is done, so SQLite commits overlap with the remaining parsing
+        size = max(MIN_CHUNK_SIZE, len(artifacts) // (4 * _pool_workers()))
+        pool = _get_process_pool()
+        futures = {
+            pool.submit(_validate_chunk, extensions[start:start + size], contents[start:start + size]): start
+            for start in range(0, len(artifacts), size)
+        }
+
+        success, failed = len(existing), 0
+        for future in as_completed(futures):
+            start = futures[future]
+            results = future.result()
+            failed += len(results) - sum(results)
+            success += self.db.insert_artifacts_stream(
+                artifact for artifact, ok in zip(artifacts[start:start + size], results) if ok
+            )
 
-        # Persist valid artifacts
-        success = self.db.insert_artifacts_batch(valid_artifacts)
-        
         return success, failed
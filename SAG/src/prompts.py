@@ -2,7 +2,8 @@
 Prompt templates for artifact generation
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from .models import PersonaContext, GenerationConfig
 from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
@@ -14,14 +15,82 @@ class PromptFactory:
 Create authentic-looking code, configurations, and documentation that a {role} would write.
 Ensure artifacts are realistic, consistent, and contextually appropriate."""
 
+    # Role-independent instructions. Kept byte-stable and placed first so
+    # every request, for any persona, shares the longest possible prefix.
+    # The output format is enforced by the response schema (see
+    # GeminiProvider), not the prompt.
+    STATIC_INSTRUCTIONS = """You are an expert developer generating realistic digital artifacts.
+Ensure artifacts are realistic, consistent, and contextually appropriate.
+Each artifact's category must be one of the requested categories.
+
+IMPORTANT: 
+- Use consistent naming/style across all artifacts
+- Include authentic technical details
+- Make content realistic and properly formatted
+"""
+
+    # Goes after DYNAMIC_MARKER: the role varies per persona
+    ROLE_PROMPT = """Create authentic-looking code, configurations, and documentation that a {role} would write.
+"""
+
+    DYNAMIC_MARKER = "---DYNAMIC---\n"
+
+    PROMPT_CACHE_SIZE = 128
+
     def __init__(self):
-        pass
+        self._static_block: str = self.STATIC_INSTRUCTIONS
+        # Rendered prompts keyed by their inputs, so retries and repeated
+        # requests skip string building entirely
+        self._render_suffix = lru_cache(maxsize=self.PROMPT_CACHE_SIZE)(self._render_suffix)
+        self._render_prompt = lru_cache(maxsize=self.PROMPT_CACHE_SIZE)(self._render_prompt)
+
+    def build_static_prefix(self) -> str:
+        """
+        Build the invariant part of the generation prompt
+        
+        Identical for every call regardless of persona, so Gemini's
+        implicit prefix caching can serve it across requests.
+        
+        Returns:
+            Static prompt prefix
+        """
+        return self._static_block
+
+    def _render_suffix(
+        self,
+        role: str,
+        context: str,
+        num_artifacts: int,
+        categories: Tuple[str, ...],
+        prior_artifacts: Optional[str],
+        shard_index: Optional[int],
+    ) -> str:
+        """Render the dynamic suffix from hashable inputs"""
+        parts = [
+            self.DYNAMIC_MARKER,
+            self.ROLE_PROMPT.format(role=role),
+            "Generate exactly ", str(num_artifacts), " realistic artifacts.\n",
+            "Categories: ", ", ".join(categories), "\n\n",
+            context,
+        ]
+
+        if prior_artifacts:
+            parts += ("\nConsider these prior artifacts for consistency:\n", prior_artifacts, "\n")
+
+        if shard_index is not None:
+            parts += (
+                "\nThis is part ", str(shard_index + 1),
+                " of a larger set: pick titles other parts are unlikely to use.\n",
+            )
+
+        return "".join(parts)
 
     def build_generation_prompt(
         self,
         persona: PersonaContext,
         config: GenerationConfig,
         prior_artifacts: Optional[str] = None,
+        shard_index: Optional[int] = None,
     ) -> str:
         """
         Build full generation prompt with persona context
@@ -30,48 +99,35 @@ Ensure artifacts are realistic, consistent, and contextually appropriate."""
             persona: PersonaContext for the persona
             config: GenerationConfig for generation settings
             prior_artifacts: Optional context of prior artifacts
+            shard_index: Optional index when the batch is split across calls
             
         Returns:
             Full prompt string
         """
-        prompt = f"""Generate exactly {config.num_artifacts} realistic artifacts for:
-
-{persona.to_context_string()}
-
-Categories: {', '.join(config.categories)}
-Format: Return a JSON array with exactly {config.num_artifacts} artifacts.
-
-Each artifact must have:
-- title: Descriptive name
-- category: {'/'.join(config.categories)}
-- file_extension: .py, .yaml, .md, etc.
-- content: Realistic artifact content
-
-"""
-        
-        if prior_artifacts:
-            prompt += f"\nConsider these prior artifacts for consistency:\n{prior_artifacts}\n"
-
-        prompt += f"""
-Return ONLY valid JSON array. Start with [ and end with ].
-Example format:
-[
-  {{
-    "title": "deployment.yaml",
-    "category": "config",
-    "file_extension": ".yaml",
-    "content": "..."
-  }},
-  ...
-]
-
-IMPORTANT: 
-- Use consistent naming/style across all artifacts
-- Include authentic technical details
-- Make content realistic and properly formatted
-"""
-        
-        return prompt
+        return self._render_prompt(
+            persona.role,
+            persona.to_context_string(),
+            config.num_artifacts,
+            tuple(config.categories),
+            prior_artifacts,
+            shard_index,
+        )
+
+    def _render_prompt(
+        self,
+        role: str,
+        context: str,
+        num_artifacts: int,
+        categories: Tuple[str, ...],
+        prior_artifacts: Optional[str],
+        shard_index: Optional[int],
+    ) -> str:
+        """Render the full prompt from hashable inputs"""
+        # Static first, dynamic last, so implicit prefix caching can match
+        return "\n".join((
+            self.build_static_prefix(),
+            self._render_suffix(role, context, num_artifacts, categories, prior_artifacts, shard_index),
+        ))
 
     @staticmethod
     def build_langchain_prompt_template(role: str = "Senior Engineer") -> ChatPromptTemplate:
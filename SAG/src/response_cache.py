@@ -0,0 +1,138 @@
+"""
+Semantic cache of /generate responses keyed by description embeddings
+"""
+
+import math
+import operator
+import threading
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from .persistence import SQLiteDB
+
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+# Entries older than this are neither served nor kept
+RESPONSE_CACHE_TTL = timedelta(days=7)
+# Newest entries kept per scope; bounds memory and the per-lookup scan
+MAX_ENTRIES_PER_SCOPE = 128
+
+
+class ResponseCache:
+    """Re-serves stored responses for descriptions similar to earlier ones"""
+
+    def __init__(
+        self,
+        db: SQLiteDB,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        ttl: timedelta = RESPONSE_CACHE_TTL,
+        max_entries: int = MAX_ENTRIES_PER_SCOPE,
+    ):
+        """
+        Initialize response cache and load stored embeddings
+        
+        Args:
+            db: SQLiteDB instance holding the response_cache table
+            threshold: Minimum cosine similarity for a hit
+            ttl: Maximum age of a served entry
+            max_entries: Entries kept per scope; the oldest are evicted
+        """
+        self.db = db
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        # scope -> oldest-first [(entry id, created_at in epoch us, unit-length embedding)]
+        self._index: Dict[str, Deque[Tuple[int, int, array]]] = {}
+        min_created_at = datetime.now() - ttl
+        evicted: List[int] = []
+        for entry_id, scope, blob, created_at in db.get_response_cache_embeddings(min_created_at):
+            vector = array("f")
+            vector.frombytes(blob)
+            evicted += self._add(scope, entry_id, created_at, vector)
+        db.delete_cached_responses(evicted, before=min_created_at)
+
+    def _add(self, scope: str, entry_id: int, created_at: int, vector: array) -> List[int]:
+        """Append an entry to a scope; returns the ids evicted to stay within max_entries"""
+        entries = self._index.setdefault(scope, deque())
+        entries.append((entry_id, created_at, vector))
+        evicted = []
+        while len(entries) > self.max_entries:
+            evicted.append(entries.popleft()[0])
+        return evicted
+
+    @staticmethod
+    def normalize(description: str) -> str:
+        """Normalize a description before embedding"""
+        return " ".join(description.lower().split())
+
+    @staticmethod
+    def scope(model: str, categories: Sequence[str], num_artifacts: int) -> str:
+        """Build the exact-match part of the key"""
+        # Only the description is compared by similarity; everything that
+        # changes the shape of the response must match exactly
+        return f"{model}|{','.join(sorted(categories))}|{num_artifacts}"
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> array:
+        """Scale an embedding to unit length so a dot product is the cosine"""
+        norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+        return array("f", (x / norm for x in embedding))
+
+    def lookup(self, scope: str, embedding: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar stored response
+        
+        Args:
+            scope: Key from scope()
+            embedding: Embedding of the normalized description
+            
+        Returns:
+            Stored response, or None if nothing reaches the threshold
+        """
+        query = self._unit(embedding)
+        cutoff = SQLiteDB._to_epoch_us(datetime.now() - self.ttl)
+        with self._lock:
+            entries = self._index.get(scope)
+            # Oldest first, so expired entries are all at the front
+            while entries and entries[0][1] <= cutoff:
+                entries.popleft()
+            entries = list(entries or ())
+
+        best_id, best_score = None, self.threshold
+        for entry_id, _, vector in entries:
+            score = sum(map(operator.mul, query, vector))
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            return None
+        return self.db.get_cached_response(best_id)
+
+    def store(
+        self,
+        query: str,
+        scope: str,
+        embedding: Sequence[float],
+        response: Dict[str, Any],
+    ):
+        """
+        Store a response for later lookups
+        
+        Args:
+            query: Normalized description
+            scope: Key from scope()
+            embedding: Embedding of the normalized description
+            response: Response body to re-serve
+        """
+        vector = self._unit(embedding)
+        now = datetime.now()
+        entry_id = self.db.insert_cached_response(query, scope, vector.tobytes(), response)
+        if entry_id is None:
+            return
+        with self._lock:
+            evicted = self._add(scope, entry_id, SQLiteDB._to_epoch_us(now), vector)
+        if evicted:
+            self.db.delete_cached_responses(evicted)
@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: make the SAG package root importable as ``src``
+"""
+
+import sys
+from pathlib import Path
+
+SAG_ROOT = str(Path(__file__).resolve().parent.parent)
+if SAG_ROOT not in sys.path:
+    sys.path.insert(0, SAG_ROOT)
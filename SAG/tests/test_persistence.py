@@ -0,0 +1,112 @@
+"""
+Tests for the SQLite persistence layer
+"""
+
+import sqlite3
+from datetime import datetime
+
+from src.models import Artifact
+from src.persistence import SQLiteDB
+
+
+# artifacts table as created by releases that stored ISO-8601 timestamps
+LEGACY_ARTIFACTS_SQL = """
+    CREATE TABLE artifacts (
+        id TEXT PRIMARY KEY,
+        persona_slug TEXT NOT NULL,
+        category TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        file_extension TEXT,
+        created_at TEXT,
+        modified_at TEXT,
+        metadata TEXT,
+        FOREIGN KEY (persona_slug) REFERENCES personas(slug)
+    )
+"""
+
+
+def _create_legacy_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_ARTIFACTS_SQL)
+    conn.execute("CREATE INDEX idx_persona_slug ON artifacts(persona_slug)")
+    conn.executemany("INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    path = str(tmp_path / "artifacts.db")
+    older = datetime(2024, 1, 2, 3, 4, 5, 678901)
+    newer = datetime(2024, 6, 1, 12, 0, 0)
+    # An ISO row from the old code and an epoch-microsecond row written
+    # into the TEXT column (stored back as a digit string)
+    _create_legacy_db(path, [
+        ("a1", "jane", "code", "old.py", "print('old')", ".py",
+         older.isoformat(), older.isoformat(), '{"source": "legacy"}'),
+        ("a2", "jane", "code", "new.py", "print('new')", ".py",
+         str(SQLiteDB._to_epoch_us(newer)), str(SQLiteDB._to_epoch_us(newer)), None),
+    ])
+
+    db = SQLiteDB(path)
+    try:
+        columns = {row["name"]: row["type"] for row in db._conn.execute("PRAGMA table_info(artifacts)")}
+        assert columns["created_at"] == "INTEGER"
+        assert columns["metadata"] == "BLOB"
+
+        artifacts = db.get_artifacts_by_persona("jane")
+        assert [a.artifact_id for a in artifacts] == ["a2", "a1"]
+        assert artifacts[0].created_at == newer
+        assert artifacts[1].created_at == older
+        assert artifacts[1].metadata == {"source": "legacy"}
+
+        # New rows sort correctly against the migrated ones
+        db.insert_artifact(Artifact(
+            persona_slug="jane", category="code", title="latest.py",
+            content="print('latest')", file_extension=".py",
+        ))
+        assert [a.title for a in db.get_artifacts_by_persona("jane")] == ["latest.py", "new.py", "old.py"]
+    finally:
+        db.close()
+
+    # Reopening a migrated database leaves it untouched
+    db = SQLiteDB(path)
+    try:
+        assert len(db.get_artifacts_by_persona("jane")) == 3
+    finally:
+        db.close()
+
+
+def test_from_epoch_us_accepts_digit_strings():
+    value = datetime(2024, 1, 2, 3, 4, 5, 6)
+    epoch_us = SQLiteDB._to_epoch_us(value)
+    assert SQLiteDB._from_epoch_us(epoch_us) == value
+    assert SQLiteDB._from_epoch_us(str(epoch_us)) == value
+    assert SQLiteDB._from_epoch_us(value.isoformat()) == value
+
+
+def test_prompt_cache_returns_stored_artifacts():
+    db = SQLiteDB(":memory:")
+    try:
+        stored = Artifact(
+            persona_slug="jane", category="code", title="a.py",
+            content="print('a')", file_extension=".py",
+        )
+        never_stored = Artifact(
+            persona_slug="jane", category="code", title="b.py",
+            content="def (:", file_extension=".py",
+        )
+        db.insert_artifact(stored)
+        ids = [never_stored.artifact_id, stored.artifact_id]
+        db.put_prompt_cache("hash", "model", ids)
+
+        cached_ids = db.get_prompt_cache("hash", "model", datetime(2000, 1, 1))
+        assert cached_ids == ids
+        assert [a.artifact_id for a in db.get_artifacts_by_ids(cached_ids)] == [stored.artifact_id]
+        assert db.get_existing_artifact_ids(ids) == {stored.artifact_id}
+
+        # Replayed artifacts are not inserted a second time
+        assert db.bulk_insert_artifacts([[stored]]) == 1
+        assert len(db.get_artifacts_by_persona("jane")) == 1
+    finally:
+        db.close()